@@ -13,13 +13,18 @@ from .ingelmia_supply import (
     CYBER_PANEL,
     CYBER_PANEL_2,
     CYBER_TEXT,
+    CYBER_WARN,
+    DEFAULT_MOD_COMPRESSION,
+    DEFAULT_UNPACK_WORKERS,
     GAME_PROFILES,
     ModManagerLogic,
     ModPacker,
     BackgroundUnpacker,
+    TaildataIndex,
     apply_lilac_to_root,
     get_profile,
     setup_lilac_styles,
+    taildata_index_cache_path,
     tr,
 )
 
@@ -31,6 +36,57 @@ high tech toolkit while still staying pure Tkinter
 """
 
 
+def format_batch_result(result, verb="Successfully updated"):
+    success_count, skipped_count, errors = result
+    result_msg = f"{verb} {success_count} files."
+    if skipped_count:
+        result_msg += f"\nSkipped/failed {skipped_count} files."
+    if errors:
+        preview = "\n".join(errors[:40])
+        if len(errors) > 40:
+            preview += f"\n...and {len(errors) - 40} more."
+        result_msg += "\n\nDetails:\n" + preview
+    return result_msg
+
+
+def ask_batch_folders():
+    target_folder = filedialog.askdirectory(title="Step 1: Select the New/Modded folder that needs taildata")
+    if not target_folder:
+        return None
+    source_folder = filedialog.askdirectory(title="Step 2: Select the Original folder to copy taildata from")
+    if not source_folder:
+        return None
+    return target_folder, source_folder
+
+
+def folder_index_builder(source_folder):
+    return lambda progress_callback: TaildataIndex.from_folder(source_folder, cache_path=taildata_index_cache_path(source_folder), progress_callback=progress_callback)
+
+
+def toc_index_builder(profile, game_folder):
+    return lambda _progress_callback: TaildataIndex.from_toc(profile, game_folder)
+
+
+def run_batch_preview(ui_queue, progress_callback, target_folder, build_index, replace_existing=False):
+    """
+    Builds the taildata index once and dry runs the batch, the window confirms before anything is written
+    """
+    try:
+        index = build_index(progress_callback)
+        result = ModPacker().batch_transfer_taildata(target_folder, index, dry_run=True)
+        ui_queue.put(("batch_preview", target_folder, index, replace_existing, result))
+    except Exception as e:
+        ui_queue.put(("error", e))
+
+
+def run_batch_update(ui_queue, progress_callback, target_folder, index, replace_existing=False):
+    try:
+        result = ModPacker().batch_transfer_taildata(target_folder, index, replace_existing=replace_existing, progress_callback=progress_callback)
+        ui_queue.put(("batch_done", result))
+    except Exception as e:
+        ui_queue.put(("error", e))
+
+
 class CyberButton(tk.Canvas):
     def __init__(self, master, text, command=None, width=230, height=48, accent=CYBER_ACCENT, **kwargs):
         super().__init__(master, width=width, height=height, highlightthickness=0, bg=CYBER_BG, **kwargs)
@@ -142,14 +198,92 @@ class ModManagerWindow(tk.Toplevel):
         self.geometry("1150x750")
         apply_lilac_to_root(self)
 
-        self.logic = ModManagerLogic(profile, game_folder=self.game_folder)
+        self.ui_queue = queue.Queue()
+        self.status_var = tk.StringVar(value="")
+        self.busy_task = None  # "verifying" or "compacting" while a worker thread runs one
+        self.polling = False
+        self.logic = ModManagerLogic(profile, game_folder=self.game_folder, backup_progress=self.queue_progress)
         self.current_mod_data = None
         self.image_index = 0
         self.tk_img = None
         self.all_mod_files = []
+        self.orphaned_mods = set()
 
         self.setup_ui()
         self.refresh_mod_list()
+        self.start_polling()
+
+    def start_polling(self):
+        """
+        Starts draining the ui queue unless a polling loop is already running
+        """
+        if not self.polling:
+            self.polling = True
+            self.after(200, self.process_ui_queue)
+
+    def queue_progress(self, done, total, note=None):
+        self.ui_queue.put(("progress", done, total, note))
+
+    def process_ui_queue(self):
+        """
+        Shows backup, verification and compaction progress, polling stops once none of them is running
+        """
+        try:
+            while True:
+                event = self.ui_queue.get_nowait()
+                if event[0] == "progress":
+                    _kind, done, total, note = event
+                    pct = (done / max(1, total)) * 100
+                    label = self.busy_task or "backing_up"
+                    self.status_var.set(f"{tr(self.language, label)} {note}: {int(pct)}%")
+                elif event[0] == "verify_done":
+                    self.busy_task = None
+                    self.status_var.set("")
+                    lines = [f"{r.container}: {r.state}, {r.detail}" for r in event[1]]
+                    for r in event[1]:
+                        if r.bad_entries:
+                            lines.append("\n".join(r.bad_entries[:20]))
+                    messagebox.showinfo(tr(self.language, "verify_containers"), "\n".join(lines))
+                elif event[0] == "compact_done":
+                    self.busy_task = None
+                    self.status_var.set("")
+                    success, msg = event[1]
+                    if success:
+                        messagebox.showinfo(tr(self.language, "status"), msg)
+                    else:
+                        messagebox.showerror(tr(self.language, "error"), msg)
+                elif event[0] == "error":
+                    self.busy_task = None
+                    self.status_var.set("")
+                    messagebox.showerror(tr(self.language, "error"), str(event[1]))
+        except queue.Empty:
+            pass
+        if self.busy_task or self.logic.backup_thread.is_alive():
+            self.after(200, self.process_ui_queue)
+        else:
+            self.polling = False
+            self.status_var.set("")
+
+    def is_compacting(self):
+        if self.busy_task == "compacting":
+            messagebox.showwarning(tr(self.language, "status"), tr(self.language, "compacting"))
+            return True
+        return False
+
+    def verify_containers(self):
+        if self.busy_task:
+            return
+        self.busy_task = "verifying"
+        threading.Thread(target=self.run_verify_task, daemon=True).start()
+        self.start_polling()
+
+    def run_verify_task(self):
+        try:
+            # the background backup builds the manifests, verifying alongside it would build them twice
+            self.logic.backup_thread.join()
+            self.ui_queue.put(("verify_done", self.logic.verify_containers(progress_callback=self.queue_progress)))
+        except Exception as e:
+            self.ui_queue.put(("error", e))
 
     def setup_ui(self):
         self.columnconfigure(0, weight=0)
@@ -181,17 +315,23 @@ class ModManagerWindow(tk.Toplevel):
         self.info_frame.grid(row=0, column=2, sticky="nsew")
         self.lbl_author = ttk.Label(self.info_frame, text=f"{tr(self.language, 'author')}:", font=("Segoe UI", 11, "bold"), style="Cyber.TLabel")
         self.lbl_author.pack(anchor="w", pady=(0, 10))
+        self.lbl_conflicts = ttk.Label(self.info_frame, text="", wraplength=330, justify="left", style="Cyber.TLabel", font=("Segoe UI", 9))
+        self.lbl_conflicts.pack(anchor="w", pady=(0, 10))
         ttk.Label(self.info_frame, text=f"{tr(self.language, 'description')}:", style="Cyber.TLabel").pack(anchor="w")
         self.txt_desc = tk.Text(self.info_frame, height=15, width=45, state="disabled", wrap="word", font=("Segoe UI", 9), bg="#09111F", fg=CYBER_TEXT, insertbackground=CYBER_TEXT, relief="flat", highlightthickness=1, highlightbackground="#2B3E58")
         self.txt_desc.pack(pady=(0, 20))
         ttk.Button(self.info_frame, text=tr(self.language, "apply_mod"), style="Cyber.TButton", command=self.apply_selected).pack(fill="x", pady=2)
         ttk.Button(self.info_frame, text=tr(self.language, "disable_mod"), style="Cyber.TButton", command=self.disable_selected).pack(fill="x", pady=2)
+        ttk.Button(self.info_frame, text=tr(self.language, "compact_containers"), style="Cyber.TButton", command=self.compact_containers).pack(fill="x", pady=2)
+        ttk.Button(self.info_frame, text=tr(self.language, "verify_containers"), style="Cyber.TButton", command=self.verify_containers).pack(fill="x", pady=2)
+        ttk.Label(self.info_frame, textvariable=self.status_var, style="Cyber.TLabel", font=("Segoe UI", 9)).pack(anchor="w", side="bottom")
         ttk.Button(self.info_frame, text=tr(self.language, "disable_all"), style="Cyber.TButton", command=self.disable_all_mods).pack(fill="x", side="bottom", pady=20)
 
     def refresh_mod_list(self):
         os.makedirs("Mods", exist_ok=True)
         self.mod_listbox.delete(0, tk.END)
         applied_mods = self.logic.get_applied_mods()
+        self.conflict_index = self.logic.conflict_index()
         self.all_mod_files = []
         for f in os.listdir("Mods"):
             if f.endswith(".attmod"):
@@ -200,6 +340,12 @@ class ModManagerWindow(tk.Toplevel):
                 self.all_mod_files.append(f)
                 if f in applied_mods:
                     self.mod_listbox.itemconfig(self.mod_listbox.size() - 1, fg=CYBER_GOOD)
+        # applied mods whose package was deleted are still listed so they can be disabled from the ledger
+        self.orphaned_mods = set(self.logic.get_orphaned_mods())
+        for f in sorted(self.orphaned_mods):
+            self.mod_listbox.insert(tk.END, f"[!] {f}")
+            self.all_mod_files.append(f)
+            self.mod_listbox.itemconfig(self.mod_listbox.size() - 1, fg=CYBER_WARN)
 
     def on_mod_select(self, _event):
         selection = self.mod_listbox.curselection()
@@ -207,6 +353,17 @@ class ModManagerWindow(tk.Toplevel):
             return
         actual_filename = self.all_mod_files[selection[0]]
         path = os.path.join("Mods", actual_filename)
+        if actual_filename in self.orphaned_mods:
+            self.current_mod_data = None
+            self.current_mod_path = path
+            self.lbl_author.config(text=f"{tr(self.language, 'author')}:")
+            self.txt_desc.config(state="normal")
+            self.txt_desc.delete("1.0", tk.END)
+            self.txt_desc.insert("1.0", tr(self.language, "missing_package"))
+            self.txt_desc.config(state="disabled")
+            self.lbl_conflicts.config(text="")
+            self.img_label.config(image="", text=tr(self.language, "no_images"))
+            return
         data = self.logic.get_mod_header(path)
         if data:
             self.current_mod_data = data
@@ -222,6 +379,12 @@ class ModManagerWindow(tk.Toplevel):
         self.txt_desc.delete("1.0", tk.END)
         self.txt_desc.insert("1.0", self.current_mod_data["meta"]["description"])
         self.txt_desc.config(state="disabled")
+        conflicts = self.conflict_index.conflicts(os.path.basename(self.current_mod_path))
+        if conflicts:
+            text = ", ".join(f"{name} ({len(keys)})" for name, keys in sorted(conflicts.items()))
+            self.lbl_conflicts.config(text=f"{tr(self.language, 'conflicts')}: {text}")
+        else:
+            self.lbl_conflicts.config(text=tr(self.language, "no_conflicts"))
         self.cycle_image(0)
 
     def cycle_image(self, delta):
@@ -238,20 +401,43 @@ class ModManagerWindow(tk.Toplevel):
             self.img_label.config(image="", text=f"Error loading image: {e}")
 
     def apply_selected(self):
-        if hasattr(self, "current_mod_path"):
+        if hasattr(self, "current_mod_path") and os.path.basename(self.current_mod_path) in self.orphaned_mods:
+            messagebox.showwarning(tr(self.language, "status"), tr(self.language, "missing_package"))
+            return
+        if hasattr(self, "current_mod_path") and not self.is_compacting():
+            conflicts = self.conflict_index.conflicts(os.path.basename(self.current_mod_path), among=self.logic.get_applied_mods())
+            if conflicts and not messagebox.askyesno("Confirm", f"{tr(self.language, 'confirm_conflicts')}\n" + "\n".join(sorted(conflicts))):
+                return
             success, msg = self.logic.apply_mod(self.current_mod_path)
             if success:
                 self.refresh_mod_list()
             messagebox.showinfo(tr(self.language, "status"), msg)
 
     def disable_selected(self):
-        if hasattr(self, "current_mod_path"):
+        if hasattr(self, "current_mod_path") and not self.is_compacting():
             success, msg = self.logic.disable_mod(self.current_mod_path)
             if success:
                 self.refresh_mod_list()
             messagebox.showinfo(tr(self.language, "status"), msg)
 
+    def compact_containers(self):
+        if self.busy_task:
+            return
+        self.busy_task = "compacting"
+        threading.Thread(target=self.run_compact_task, daemon=True).start()
+        self.start_polling()
+
+    def run_compact_task(self):
+        try:
+            # payloads are only moved once the backup thread is done reading the containers
+            self.logic.backup_thread.join()
+            self.ui_queue.put(("compact_done", self.logic.compact_all(progress_callback=self.queue_progress)))
+        except Exception as e:
+            self.ui_queue.put(("error", e))
+
     def disable_all_mods(self):
+        if self.is_compacting():
+            return
         if messagebox.askyesno("Confirm", tr(self.language, "confirm_reset")):
             success, msg = self.logic.disable_all()
             messagebox.showinfo(tr(self.language, "status"), msg)
@@ -264,13 +450,18 @@ class ModCreatorWindow(tk.Toplevel):
         super().__init__(master)
         self.language = language
         self.title(f"Ingelmia {tr(language, 'mod_creator')}")
-        self.geometry("620x760")
+        self.geometry("620x850")
         self.resizable(False, False)
         apply_lilac_to_root(self)
 
         self.packer = ModPacker()
         self.files_to_pack = []
         self.image_paths = []
+        self.compress_var = tk.BooleanVar(value=False)
+        self.progress_var = tk.DoubleVar(value=0)
+        self.status_var = tk.StringVar(value="")
+        self.ui_queue = queue.Queue()
+        self.is_working = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -304,29 +495,22 @@ class ModCreatorWindow(tk.Toplevel):
         self.listbox = tk.Listbox(frame_files, bg="#09111F", fg=CYBER_TEXT, relief="flat")
         self.listbox.pack(fill="both", expand=True, pady=5)
         ttk.Button(frame_files, text=tr(self.language, "clear_files"), style="Cyber.TButton", command=self.clear_files).pack(anchor="w")
-        ttk.Button(self, text=tr(self.language, "create_package"), style="Cyber.TButton", command=self.create_mod).pack(pady=12)
+        ttk.Checkbutton(self, text=tr(self.language, "compress_files"), variable=self.compress_var, style="Cyber.TCheckbutton").pack(pady=(8, 0))
+        self.create_btn = ttk.Button(self, text=tr(self.language, "create_package"), style="Cyber.TButton", command=self.create_mod)
+        self.create_btn.pack(pady=(12, 4))
+        ttk.Progressbar(self, variable=self.progress_var, maximum=100, length=560, style="Cyber.Horizontal.TProgressbar").pack(padx=10)
+        ttk.Label(self, textvariable=self.status_var, style="Cyber.TLabel").pack(pady=(2, 6))
         ttk.Button(self, text=tr(self.language, "transfer_taildata"), style="Cyber.TButton", command=self.transfer_taildata_gui).pack(pady=5)
         ttk.Button(self, text=tr(self.language, "batch_update_files"), style="Cyber.TButton", command=self.batch_update_files_gui).pack(pady=5)
 
     def batch_update_files_gui(self):
-        target_folder = filedialog.askdirectory(title="Step 1: Select the New/Modded folder that needs taildata")
-        if not target_folder:
+        if self.is_working:
             return
-
-        source_folder = filedialog.askdirectory(title="Step 2: Select the Original folder to copy taildata from")
-        if not source_folder:
+        folders = ask_batch_folders()
+        if not folders:
             return
-
-        success_count, skipped_count, errors = self.packer.batch_transfer_taildata_by_filename(target_folder, source_folder)
-        result_msg = f"Successfully updated {success_count} files."
-        if skipped_count:
-            result_msg += f"\nSkipped/failed {skipped_count} files."
-        if errors:
-            preview = "\n".join(errors[:40])
-            if len(errors) > 40:
-                preview += f"\n...and {len(errors) - 40} more."
-            result_msg += "\n\nDetails:\n" + preview
-        messagebox.showinfo("Batch Update Result", result_msg)
+        target_folder, source_folder = folders
+        self.start_task(run_batch_preview, self.ui_queue, self.queue_progress, target_folder, folder_index_builder(source_folder))
 
     def transfer_taildata_gui(self):
         targets = filedialog.askopenfilenames(title="Step 1: Select the New/Modded files in order")
@@ -374,6 +558,8 @@ class ModCreatorWindow(tk.Toplevel):
         self.listbox.delete(0, tk.END)
 
     def create_mod(self):
+        if self.is_working:
+            return
         if not self.files_to_pack:
             messagebox.showwarning("Warning", tr(self.language, "warning_no_files"))
             return
@@ -385,12 +571,71 @@ class ModCreatorWindow(tk.Toplevel):
             "version": self.ent_version.get(),
             "description": self.text_desc.get("1.0", tk.END).strip(),
         }
-        success, msg = self.packer.create_package(meta, self.files_to_pack, out_path, self.image_paths)
-        if success:
-            messagebox.showinfo("Success", msg)
-            self.destroy()
-        else:
-            messagebox.showerror("Error", msg)
+        compression = DEFAULT_MOD_COMPRESSION if self.compress_var.get() else None
+        self.start_task(self.run_create_task, meta, list(self.files_to_pack), out_path, list(self.image_paths), compression)
+
+    def start_task(self, target, *args):
+        self.is_working = True
+        self.create_btn.state(["disabled"])
+        self.progress_var.set(0)
+        self.status_var.set(tr(self.language, "processing"))
+        threading.Thread(target=target, args=args, daemon=True).start()
+        self.after(80, self.process_ui_queue)
+
+    def finish_task(self):
+        self.is_working = False
+        self.create_btn.state(["!disabled"])
+
+    def run_create_task(self, meta, files, out_path, image_paths, compression):
+        try:
+            success, msg = self.packer.create_package(meta, files, out_path, image_paths, compression=compression, progress_callback=self.queue_progress)
+            self.ui_queue.put(("done", success, msg))
+        except Exception as e:
+            self.ui_queue.put(("done", False, str(e)))
+
+    def queue_progress(self, done, total, note=None):
+        self.ui_queue.put(("progress", done, total, note))
+
+    def process_ui_queue(self):
+        try:
+            while True:
+                event = self.ui_queue.get_nowait()
+                if event[0] == "progress":
+                    _kind, done, total, note = event
+                    pct = (done / max(1, total)) * 100
+                    self.progress_var.set(pct)
+                    self.status_var.set(f"{note} {done}/{total} ({int(pct)}%)" if note else f"Working {done}/{total} ({int(pct)}%)")
+                elif event[0] == "batch_preview":
+                    _kind, target_folder, index, replace_existing, result = event
+                    self.finish_task()
+                    self.status_var.set("")
+                    if messagebox.askyesno("Batch Update Preview", format_batch_result(result, "Ready to update") + "\n\nWrite taildata now?"):
+                        self.start_task(run_batch_update, self.ui_queue, self.queue_progress, target_folder, index, replace_existing)
+                    return
+                elif event[0] == "batch_done":
+                    self.finish_task()
+                    self.status_var.set(tr(self.language, "complete_batch"))
+                    messagebox.showinfo("Batch Update Result", format_batch_result(event[1]))
+                    return
+                elif event[0] == "error":
+                    self.finish_task()
+                    self.status_var.set(f"{tr(self.language, 'error')}: {event[1]}")
+                    messagebox.showerror(tr(self.language, "error"), str(event[1]))
+                    return
+                elif event[0] == "done":
+                    _kind, success, msg = event
+                    self.finish_task()
+                    if success:
+                        self.progress_var.set(100)
+                        messagebox.showinfo("Success", msg)
+                        self.destroy()
+                    else:
+                        self.status_var.set(f"{tr(self.language, 'error')}: {msg}")
+                        messagebox.showerror("Error", msg)
+                    return
+        except queue.Empty:
+            pass
+        self.after(80, self.process_ui_queue)
 
 
 class Core_Tools:
@@ -406,6 +651,8 @@ class Core_Tools:
         self.game_var = tk.StringVar(value="ascension")
         self.language_var = tk.StringVar(value="en")
         self.game_folder_var = tk.StringVar(value=os.getcwd())
+        self.include_var = tk.StringVar(value="")
+        self.exclude_var = tk.StringVar(value="")
         self.status_var = tk.StringVar(value=tr("en", "idle"))
         self.progress_var = tk.DoubleVar(value=0)
         self.ui_queue = queue.Queue()
@@ -488,11 +735,28 @@ class Core_Tools:
             accent=CYBER_ACCENT,
         )
         self.batch_update_btn.place(x=335, y=355)
+        self.batch_toc_btn = CyberButton(
+            self.root,
+            tr(self.language, "batch_update_toc"),
+            self.batch_update_toc_gui,
+            width=250,
+            accent=CYBER_ACCENT_2,
+        )
+        self.batch_toc_btn.place(x=595, y=355)
+
+        self.include_label = ttk.Label(self.root, text=tr(self.language, "include_filter"), style="Cyber.TLabel", font=("Segoe UI", 10, "bold"))
+        self.include_label.place(x=80, y=416)
+        self.include_entry = ttk.Entry(self.root, textvariable=self.include_var, width=32)
+        self.include_entry.place(x=180, y=416)
+        self.exclude_label = ttk.Label(self.root, text=tr(self.language, "exclude_filter"), style="Cyber.TLabel", font=("Segoe UI", 10, "bold"))
+        self.exclude_label.place(x=470, y=416)
+        self.exclude_entry = ttk.Entry(self.root, textvariable=self.exclude_var, width=32)
+        self.exclude_entry.place(x=570, y=416)
 
         self.status_label = ttk.Label(self.root, textvariable=self.status_var, style="Cyber.TLabel", font=("Segoe UI", 10))
-        self.status_label.place(x=80, y=448)
+        self.status_label.place(x=80, y=458)
         self.progress = ttk.Progressbar(self.root, variable=self.progress_var, maximum=100, length=760, mode="determinate", style="Cyber.Horizontal.TProgressbar")
-        self.progress.place(x=80, y=480)
+        self.progress.place(x=80, y=490)
 
         self.on_profile_changed()
 
@@ -543,9 +807,12 @@ class Core_Tools:
         self.manager_btn.configure_text(tr(lang, "open_manager"))
         self.unpack_btn.configure_text(tr(lang, "unpack"))
         self.batch_update_btn.configure_text(tr(lang, "batch_update_files"))
+        self.batch_toc_btn.configure_text(tr(lang, "batch_update_toc"))
 
         self.folder_btn.configure_text(tr(lang, "select_game_folder"))
         self.folder_label.config(text=tr(lang, "game_folder"))
+        self.include_label.config(text=tr(lang, "include_filter"))
+        self.exclude_label.config(text=tr(lang, "exclude_filter"))
 
         if not self.is_working:
             self.status_var.set(tr(lang, "idle"))
@@ -571,30 +838,34 @@ class Core_Tools:
             self.mod_creator_window.focus_force()
 
     def batch_update_files_gui(self):
-        target_folder = filedialog.askdirectory(title="Step 1: Select the New/Modded folder that needs taildata")
-        if not target_folder:
+        if self.is_working:
             return
+        folders = ask_batch_folders()
+        if not folders:
+            return
+        target_folder, source_folder = folders
+        self.start_batch_preview(target_folder, folder_index_builder(source_folder))
 
-        source_folder = filedialog.askdirectory(title="Step 2: Select the Original folder to copy taildata from")
-        if not source_folder:
+    def batch_update_toc_gui(self):
+        if self.is_working:
             return
+        target_folder = filedialog.askdirectory(title="Select the New/Modded folder that needs taildata from the game files")
+        if not target_folder:
+            return
+        self.start_batch_preview(target_folder, toc_index_builder(self.profile, self.game_folder_var.get()), replace_existing=True)
 
-        packer = ModPacker()
-        success_count, skipped_count, errors = packer.batch_transfer_taildata_by_filename(target_folder, source_folder)
-        result_msg = f"Successfully updated {success_count} files."
-        if skipped_count:
-            result_msg += f"\nSkipped/failed {skipped_count} files."
-        if errors:
-            preview = "\n".join(errors[:40])
-            if len(errors) > 40:
-                preview += f"\n...and {len(errors) - 40} more."
-            result_msg += "\n\nDetails:\n" + preview
-        messagebox.showinfo("Batch Update Result", result_msg)
+    def start_batch_preview(self, target_folder, build_index, replace_existing=False):
+        self.set_working(True)
+        self.progress_var.set(0)
+        self.status_var.set(tr(self.language, "processing"))
+        args = (self.ui_queue, self.queue_progress, target_folder, build_index, replace_existing)
+        threading.Thread(target=run_batch_preview, args=args, daemon=True).start()
 
     def set_working(self, working: bool):
         self.is_working = working
         self.unpack_btn.set_enabled(not working)
         self.batch_update_btn.set_enabled(not working)
+        self.batch_toc_btn.set_enabled(not working)
         self.game_toggle.unbind("<Button-1>") if working else self.game_toggle.bind("<Button-1>", self.game_toggle.click)
 
     def queue_progress(self, done, total, note=None):
@@ -613,6 +884,20 @@ class Core_Tools:
                     self.progress_var.set(100)
                     self.status_var.set(tr(self.language, "complete"))
                     self.set_working(False)
+                elif event[0] == "batch_preview":
+                    _kind, target_folder, index, replace_existing, result = event
+                    self.set_working(False)
+                    self.status_var.set(tr(self.language, "idle"))
+                    if messagebox.askyesno("Batch Update Preview", format_batch_result(result, "Ready to update") + "\n\nWrite taildata now?"):
+                        self.set_working(True)
+                        self.progress_var.set(0)
+                        args = (self.ui_queue, self.queue_progress, target_folder, index, replace_existing)
+                        threading.Thread(target=run_batch_update, args=args, daemon=True).start()
+                elif event[0] == "batch_done":
+                    self.progress_var.set(100)
+                    self.status_var.set(tr(self.language, "complete_batch"))
+                    self.set_working(False)
+                    messagebox.showinfo("Batch Update Result", format_batch_result(event[1]))
                 elif event[0] == "error":
                     self.set_working(False)
                     self.status_var.set(f"{tr(self.language, 'error')}: {event[1]}")
@@ -629,15 +914,22 @@ class Core_Tools:
         self.status_var.set(f"{tr(self.language, 'processing')}: {self.profile.title}")
         profile = self.profile
         game_folder = self.game_folder_var.get()
-        thread = threading.Thread(target=self.run_unpack_task, args=(profile, game_folder), daemon=True)
+        filters = (self.include_var.get(), self.exclude_var.get())
+        thread = threading.Thread(target=self.run_unpack_task, args=(profile, game_folder, filters), daemon=True)
         thread.start()
 
-    def run_unpack_task(self, profile, game_folder):
+    def run_unpack_task(self, profile, game_folder, filters=("", "")):
         try:
             unpacker = BackgroundUnpacker(
                 progress_callback=self.queue_progress,
                 profile=profile,
                 game_folder=game_folder,
+                workers=DEFAULT_UNPACK_WORKERS,
+                parallel_containers=True,
+                zero_copy=True,
+                incremental=True,
+                include=filters[0],
+                exclude=filters[1],
             )
             unpacker.unpack_all()
             self.ui_queue.put(("done",))
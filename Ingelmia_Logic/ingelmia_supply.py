@@ -1,10 +1,18 @@
-import os, shutil, struct, io
+import os, re, sys, shutil, struct, io, threading, mmap, errno, zlib, lzma, fnmatch, tempfile, bisect, hashlib, sqlite3
+from collections import deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 import tkinter as tk
 from tkinter import messagebox, ttk
 from PIL import Image, ImageOps
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 """
 Utility logic for Ingelmia Engine
 """
@@ -26,11 +34,71 @@ LILAC = CYBER_BG
 LILAC_RGB = (8, 11, 22)
 
 SIGNATURE = b"\x47\x52\x45\x53"  # GRES
+PAK_HEADER_SIZE = 12  # signature(4), unknown(4), file_count(4)
+PAK_ENTRY_TAIL_SIZE = 8  # file_offset(4), file_size(4) after each entry name
 MOD_SIGNATURE = b"ATTMOD"
+MOD_SIGNATURE_V2 = b"ATTMOD2"  # v2 adds a directory offset to the header and an entry directory at the end, used for compressed packages
+MOD_DIRECTORY_MAGIC = b"IGMD"
+MOD_DIRECTORY_TRAILER = struct.Struct("<Q4s")  # directory offset, MOD_DIRECTORY_MAGIC, closes stored v1 packages so older readers still load them
+MOD_DIRECTORY_ENTRY = struct.Struct("<BIIIQIIIBBH")  # container_id, meta_offset, orig_off, orig_size, data_offset, stored_size, payload_size, crc32, tail_size, codec, name length
+MOD_CODEC_STORED = 0
+MOD_CODEC_ZLIB = 1
+MOD_CODEC_LZMA = 2
+MOD_CODEC_ZSTD = 3
+MOD_CODECS = {"zlib": MOD_CODEC_ZLIB, "lzma": MOD_CODEC_LZMA, "zstd": MOD_CODEC_ZSTD}
+MOD_IO_CHUNK = 1024 * 1024
+MOD_WRITE_BUFFER = 8 * 1024 * 1024  # output buffer for package writes
+MOD_SPOOL_SIZE = 8 * 1024 * 1024  # compressed entries up to this size stay in memory before the writer copies them
+MOD_QUEUE_DEPTH = 2  # entries compressed ahead per pack worker
+DEFAULT_MOD_COMPRESSION = "zstd" if zstandard is not None else "zlib"
 BACKUP_FOLDER = "Backups"
+BACKUP_META_MAGIC = b"IGMB"
+BACKUP_META_VERSION = 1
+BACKUP_META_HEADER = struct.Struct("<4sBB2xQQ32s")  # magic, version, flags, metadata size, vanilla size, region hash of the vanilla manifest
+BACKUP_META_HASHED = 1
+BACKUP_HASH_CHUNK = 8 * 1024 * 1024
+MANIFEST_MAGIC = b"IGVM"
+MANIFEST_VERSION = 1
+MANIFEST_HEADER = struct.Struct("<4sB3xQQIII16s")  # magic, version, metadata size, vanilla size, chunk size, chunk count, entry count, metadata digest
+MANIFEST_ENTRY = struct.Struct("<III")  # file_offset, file_size, crc32 of the entry data
+MANIFEST_DIGEST_SIZE = 16
+VERIFY_CHUNK = 16 * 1024 * 1024
+VERIFY_BATCH = 4 * 1024 * 1024  # entry bytes crc'd per pool task
 TAILDATA_V2_MAGIC = b"IGT2"
 TAILDATA_V2_SIZE = 17  # magic(4), container_id(1), meta_offset(4), orig_off(4), orig_size(4)
 TAILDATA_LEGACY_SIZE = 11  # container_id(1), meta_offset_low16(2), orig_off(4), orig_size(4)
+INDEX_CACHE_MAGIC = b"IGIX"
+INDEX_CACHE_VERSION = 1
+INDEX_CACHE_HEADER = struct.Struct("<4sB3xQqIIII")  # magic, version, container size, mtime_ns, metadata crc32, count, entry_name_size, names length
+COMPACT_JOURNAL_MAGIC = b"IGCJ"
+COMPACT_JOURNAL_VERSION = 1
+COMPACT_JOURNAL_HEADER = struct.Struct("<4sB3xIIQQ")  # magic, version, move count, next move, bytes done in that move, final container size
+COMPACT_MOVE = struct.Struct("<QQQI")  # source offset, destination offset, length, TOC patch count
+COMPACT_PATCH = struct.Struct("<III")  # meta_offset, new file_offset, file_size
+COMPACT_CHUNK = 8 * 1024 * 1024
+COMPACT_MIN_GAP = 1024 * 1024  # an extent that would overlap itself is left in place when the hole before it is smaller
+TOC_JOURNAL_MAGIC = b"IGWL"
+TOC_JOURNAL_VERSION = 1
+TOC_JOURNAL_HEADER = struct.Struct("<4sBBBxIIII")  # magic, version, state, ledger op, mod path bytes, key count, patch count, crc32 of the body
+TOC_JOURNAL_KEY = struct.Struct("<IBI")  # position of the mod in the batch, container id, meta offset
+TOC_JOURNAL_PATCH = struct.Struct("<BIIIII")  # container id, meta offset, old offset, old size, new offset, new size
+TOC_JOURNAL_PENDING = 0  # journal is durable, the TOC may be partially patched
+TOC_JOURNAL_APPLIED = 1  # every TOC patch is durable, only the ledger update may be missing
+TOC_LEDGER_NONE = 0
+TOC_LEDGER_ADD = 1
+TOC_LEDGER_REMOVE = 2
+TAILDATA_INDEX_MAGIC = b"IGTI"
+TAILDATA_INDEX_VERSION = 1
+TAILDATA_INDEX_HEADER = struct.Struct("<4sB3xI")  # magic, version, record count
+TAILDATA_INDEX_RECORD = struct.Struct("<HQqB")  # path length, file size, mtime_ns, taildata length
+TAILDATA_PROGRESS_STEP = 64  # source files read between index progress reports
+UNPACK_READ_SIZE = 8 * 1024 * 1024
+UNPACK_READ_ALIGN = 4096
+UNPACK_QUEUE_DEPTH = 4  # pending write jobs allowed per unpack worker
+UNPACK_CHECKPOINT_INTERVAL = 512  # finished entries between checkpoint saves
+DEFAULT_UNPACK_WORKERS = min(8, os.cpu_count() or 1)
+DEFAULT_PACK_WORKERS = DEFAULT_UNPACK_WORKERS
+DEFAULT_VERIFY_WORKERS = min(8, os.cpu_count() or 1)
 
 LANGUAGES = {
     "en": {
@@ -52,6 +120,7 @@ LANGUAGES = {
         "ready": "Ready",
         "processing": "Processing",
         "complete": "Unpacking complete.",
+        "complete_batch": "Batch update complete.",
         "missing": "Missing",
         "error": "Error",
         "status": "Status",
@@ -63,6 +132,15 @@ LANGUAGES = {
         "apply_mod": "Apply Mod",
         "disable_mod": "Disable Mod",
         "disable_all": "Disable All Mods",
+        "compact_containers": "Reclaim Space",
+        "backing_up": "Backing up",
+        "verify_containers": "Verify Containers",
+        "conflicts": "Conflicts",
+        "no_conflicts": "No conflicts",
+        "missing_package": "Package missing from Mods, disable it to restore its entries",
+        "confirm_conflicts": "This mod changes the same files as applied mods, the one applied last wins:",
+        "verifying": "Verifying",
+        "compacting": "Compacting",
         "prev": "< Prev",
         "next": "Next >",
         "no_images": "No Images",
@@ -77,7 +155,11 @@ LANGUAGES = {
         "create_package": "Create Mod Package",
         "transfer_taildata": "Transfer Taildata",
         "batch_update_files": "Batch Update Files",
+        "batch_update_toc": "Batch Update From Game",
         "warning_no_files": "No files added!",
+        "include_filter": "Include",
+        "exclude_filter": "Exclude",
+        "compress_files": "Compress files",
     },
     "ru": {
         "app_title": "Ingelmia Engine",
@@ -98,6 +180,7 @@ LANGUAGES = {
         "ready": "Готово",
         "processing": "Обработка",
         "complete": "Распаковка завершена.",
+        "complete_batch": "Пакетное обновление завершено.",
         "missing": "Не найден",
         "error": "Ошибка",
         "status": "Статус",
@@ -109,6 +192,15 @@ LANGUAGES = {
         "apply_mod": "Применить мод",
         "disable_mod": "Отключить мод",
         "disable_all": "Отключить все моды",
+        "compact_containers": "Освободить место",
+        "backing_up": "Резервное копирование",
+        "verify_containers": "Проверить контейнеры",
+        "conflicts": "Конфликты",
+        "no_conflicts": "Конфликтов нет",
+        "missing_package": "Пакет отсутствует в папке Mods, отключите мод, чтобы восстановить его записи",
+        "confirm_conflicts": "Этот мод изменяет те же файлы, что и применённые моды, побеждает применённый последним:",
+        "verifying": "Проверка",
+        "compacting": "Сжатие",
         "prev": "< Назад",
         "next": "Вперёд >",
         "no_images": "Нет изображений",
@@ -123,7 +215,11 @@ LANGUAGES = {
         "create_package": "Создать пакет мода",
         "transfer_taildata": "Перенести Taildata",
         "batch_update_files": "Пакетно обновить файлы",
+        "batch_update_toc": "Обновить по файлам игры",
         "warning_no_files": "Файлы не добавлены!",
+        "include_filter": "Включить",
+        "exclude_filter": "Исключить",
+        "compress_files": "Сжимать файлы",
     },
 }
 
@@ -219,6 +315,8 @@ def setup_lilac_styles(root):
     style.configure("CyberMuted.TLabel", background=CYBER_BG, foreground=CYBER_MUTED)
     style.configure("Cyber.TButton", background=CYBER_PANEL_2, foreground=CYBER_TEXT, borderwidth=0, focusthickness=0, padding=(12, 8))
     style.map("Cyber.TButton", background=[("active", CYBER_ACCENT_2)], foreground=[("active", "white")])
+    style.configure("Cyber.TCheckbutton", background=CYBER_BG, foreground=CYBER_TEXT)
+    style.map("Cyber.TCheckbutton", background=[("active", CYBER_BG)])
     style.configure("Cyber.Horizontal.TProgressbar", troughcolor=CYBER_PANEL, background=CYBER_ACCENT, bordercolor=CYBER_PANEL, lightcolor=CYBER_ACCENT, darkcolor=CYBER_ACCENT)
     return style
 
@@ -235,24 +333,171 @@ def resize_and_pad(image_path):
         img = ImageOps.pad(img, (500, 500), color=LILAC_RGB, centering=(0.5, 0.5))
         return img
 
+
+def encode_preview_image(image_path: str) -> Optional[bytes]:
+    """
+    Returns the 500x500 JPEG bytes stored in a mod package, None if the image is missing or unreadable
+    """
+    if not os.path.exists(image_path):
+        return None
+    try:
+        with Image.open(image_path) as img:
+            if img.mode in ("RGBA", "P"):
+                img = img.convert("RGB")
+            img = ImageOps.pad(img, (500, 500), color=LILAC_RGB)
+            img_byte_arr = io.BytesIO()
+            img.save(img_byte_arr, format="JPEG", quality=85)
+            return img_byte_arr.getvalue()
+    except Exception as e:
+        print(f"Skipping image {image_path}: {e}")
+        return None
+
 # Backups/Taildata
 
+class ContainerBackup:
+    """
+    Metadata only backup of a container, the original TOC block plus the sizes and the region hash of the
+    vanilla data behind it, which is everything Disable All needs to restore it
+
+    The region hash is taken from the first manifest, so hashing the data region costs no extra read
+    """
+
+    def __init__(self, path: str, metadata: bytes, vanilla_size: int, vanilla_hash: Optional[bytes] = None):
+        self.path = path
+        self.metadata = metadata
+        self.vanilla_size = vanilla_size
+        self.vanilla_hash = vanilla_hash
+
+    @property
+    def metadata_size(self) -> int:
+        return len(self.metadata)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ContainerBackup"]:
+        try:
+            with open(path, "rb") as f:
+                magic, version, flags, metadata_size, vanilla_size, digest = BACKUP_META_HEADER.unpack(f.read(BACKUP_META_HEADER.size))
+                if magic != BACKUP_META_MAGIC or version != BACKUP_META_VERSION:
+                    return None
+                metadata = f.read(metadata_size)
+        except (OSError, struct.error):
+            return None
+        if len(metadata) != metadata_size:
+            return None
+        return cls(path, metadata, vanilla_size, digest if flags & BACKUP_META_HASHED else None)
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            flags = BACKUP_META_HASHED if self.vanilla_hash else 0
+            f.write(BACKUP_META_HEADER.pack(BACKUP_META_MAGIC, BACKUP_META_VERSION, flags, self.metadata_size, self.vanilla_size, self.vanilla_hash or bytes(32)))
+            f.write(self.metadata)
+        os.replace(tmp_path, self.path)
+
+
+def backup_paths(profile: GameProfile, container: ContainerProfile) -> Tuple[str, str]:
+    """
+    (metadata backup, full copy) paths in Backups/<game>/
+    """
+    full_path = project_path(BACKUP_FOLDER, profile.key, container.name)
+    return full_path + ".meta", full_path
+
+
+def read_metadata_block(path: str, profile: GameProfile, container: ContainerProfile) -> bytes:
+    """
+    The header and TOC at the start of a container, sized by the profile or by the header's file count
+    """
+    with open(path, "rb") as f:
+        if container.metadata_size:
+            return f.read(container.metadata_size)
+        header = f.read(PAK_HEADER_SIZE)
+        count = int.from_bytes(header[8:12], "little")
+        return header + f.read(count * (profile.entry_name_size + PAK_ENTRY_TAIL_SIZE))
+
+
+def load_backup_metadata(profile: GameProfile, container: ContainerProfile) -> Optional[bytes]:
+    """
+    Original metadata block from whichever backup exists, None if there is none
+    """
+    meta_path, full_path = backup_paths(profile, container)
+    backup = ContainerBackup.load(meta_path)
+    if backup:
+        return backup.metadata
+    if os.path.exists(full_path):
+        return read_metadata_block(full_path, profile, container)
+    return None
+
+
 def ensure_backups(profile: GameProfile, game_folder: Optional[str] = None) -> None:
+    """
+    Captures the metadata block of every container that has no backup yet, this only reads the TOC so it is quick,
+    the vanilla hash and any full copies are made later by complete_backups
+    """
     os.makedirs(project_path(BACKUP_FOLDER), exist_ok=True)
     game_backup_folder = project_path(BACKUP_FOLDER, profile.key)
     os.makedirs(game_backup_folder, exist_ok=True)
 
     for container in profile.containers:
         source = game_path(game_folder, container.name)
-        dest = os.path.join(game_backup_folder, container.name)
+        meta_path, full_path = backup_paths(profile, container)
 
-        if os.path.exists(source) and not os.path.exists(dest):
+        if os.path.exists(source) and not os.path.exists(meta_path):
             try:
-                shutil.copy2(source, dest)
+                # an older full copy is the better source, the live container may already be modded
+                origin = full_path if os.path.exists(full_path) else source
+                vanilla_size = container.vanilla_size or os.path.getsize(origin)
+                ContainerBackup(meta_path, read_metadata_block(origin, profile, container), vanilla_size).save()
             except Exception as e:
                 messagebox.showerror("Backup Error", f"Failed to back up {source}: {e}")
 
 
+def copy_container_backup(source: str, dest: str, size: int, metadata: bytes, progress_callback: Optional[Callable[[int, int], None]] = None) -> None:
+    """
+    Full vanilla copy through copy_file_span, copy_file_range clones the extents on filesystems with reflinks,
+    the metadata block is written from the backup since the live TOC may be patched while the copy runs
+    """
+    tmp_path = dest + ".tmp"
+    with open(source, "rb", buffering=0) as src, open(tmp_path, "wb", buffering=0) as dst:
+        pos = 0
+        while pos < size:
+            step = min(BACKUP_HASH_CHUNK, size - pos)
+            if copy_file_span(src.fileno(), pos, step, dst.fileno()) != step:
+                raise OSError(f"{os.path.basename(source)} is shorter than its vanilla size")
+            pos += step
+            if progress_callback:
+                progress_callback(pos, size)
+        dst.seek(0)
+        dst.write(metadata)
+    shutil.copystat(source, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def complete_backups(profile: GameProfile, game_folder: Optional[str] = None, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                     full: bool = False) -> None:
+    """
+    Slow half of the backups, meant for a background thread: builds the verification manifest of each
+    metadata backup, whose single pass over the vanilla data region also yields the backup's region hash,
+    and with full=True makes whole container copies that don't exist yet
+    """
+    for container in profile.containers:
+        source = game_path(game_folder, container.name)
+        meta_path, full_path = backup_paths(profile, container)
+        backup = ContainerBackup.load(meta_path)
+        if backup is None or not os.path.exists(source):
+            continue
+        report = (lambda done, total, name=container.name: progress_callback(done, total, name)) if progress_callback else None
+        try:
+            # the manifest is taken while the data region is known to match the backup
+            manifest = load_manifest(profile, container, game_folder, progress_callback=report)
+            if backup.vanilla_hash is None and manifest is not None and manifest.vanilla_size == backup.vanilla_size:
+                backup.vanilla_hash = manifest.region_hash()
+                backup.save()
+            if full and not os.path.exists(full_path):
+                copy_container_backup(source, full_path, backup.vanilla_size, backup.metadata, report)
+        except Exception as e:
+            print(f"Backup of {container.name} incomplete: {e}")
+
+
 def pack_taildata(container_id: int, meta_offset: int, file_offset: int, file_size: int) -> bytes:
     return TAILDATA_V2_MAGIC + struct.pack("<BIII", container_id, meta_offset, file_offset, file_size)
 
@@ -272,355 +517,3017 @@ def unpack_taildata(file_data: bytes) -> Tuple[int, int, int, int, int]:
     raise ValueError("File does not contain valid Ingelmia taildata.")
 
 
-class BackgroundUnpacker:
-    def __init__(
-        self,
-        progress_callback: Optional[Callable] = None,
-        profile: Optional[GameProfile] = None,
-        game_folder: Optional[str] = None,
-    ):
-        self.progress_callback = progress_callback
-        self.profile = profile or GAME_PROFILES["ascension"]
-        self.game_folder = game_folder
+def read_file_tail(f) -> Tuple[bytes, int]:
+    """
+    Returns the last TAILDATA_V2_SIZE bytes (fewer for short files) and the file size, nothing before them is read
+    """
+    size = f.seek(0, os.SEEK_END)
+    f.seek(size - min(TAILDATA_V2_SIZE, size))
+    return f.read(), size
 
-    def unpack_all(self) -> None:
-        ensure_backups(self.profile, self.game_folder)
-        for container in self.profile.containers:
-            self.unpack_resource(container)
 
-    def unpack_resource(self, container: ContainerProfile) -> None:
-        pak_path = game_path(self.game_folder, container.name)
-        folder_name = project_path(container.output_folder)
-        container_id = container.cid
+def has_taildata_v2(tail: bytes) -> bool:
+    return len(tail) >= TAILDATA_V2_SIZE and tail[-TAILDATA_V2_SIZE:-TAILDATA_V2_SIZE + 4] == TAILDATA_V2_MAGIC
 
-        if not os.path.exists(pak_path):
-            messagebox.showwarning("File Missing", f"Could not find {pak_path}. Select the folder containing the game's PAK files.")
-            return
 
-        os.makedirs(folder_name, exist_ok=True)
+def read_source_taildata(source_path: str) -> bytes:
+    """
+    Returns the raw taildata at the end of source_path, only the tail of the file is read
+    """
+    if not os.path.exists(source_path):
+        raise FileNotFoundError(f"Source missing: {os.path.basename(source_path)}")
+    with open(source_path, "rb") as s:
+        tail, _size = read_file_tail(s)
+    _cid, _meta, _off, _size, tail_size = unpack_taildata(tail)
+    return tail[-tail_size:]
 
-        with open(pak_path, "rb") as f:
-            sig = f.read(4)
-            if sig != self.profile.signature:
-                raise ValueError(f"Invalid signature in {pak_path}: expected {self.profile.signature!r}, got {sig!r}")
 
-            f.read(4)
-            file_count = int.from_bytes(f.read(4), "little")
+# PAK TOC
 
-            for i in range(file_count):
-                meta_offset = f.tell()
-                filename_raw = f.read(self.profile.entry_name_size)
-                clean_bytes = filename_raw.split(b"\x00", 1)[0]
-                filename = clean_bytes.decode(self.profile.encoding, errors="ignore") or f"unnamed_{i:06d}.bin"
-                file_offset = int.from_bytes(f.read(4), "little")
-                file_size = int.from_bytes(f.read(4), "little")
-                return_pos = f.tell()
+class PakEntry(NamedTuple):
+    index: int
+    name: str
+    file_offset: int
+    file_size: int
+    meta_offset: int
 
-                f.seek(file_offset)
-                file_data = f.read(file_size)
-                taildata = pack_taildata(container_id, meta_offset, file_offset, file_size)
 
-                output_path = os.path.join(folder_name, filename)
-                os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+class PakIndex:
+    """
+    Array backed table of a GRES container's TOC
 
-                with open(output_path, "wb") as out:
-                    out.write(file_data)
-                    out.write(taildata)
+    The whole metadata block is read in one go and decoded with struct.iter_unpack,
+    offsets/sizes/meta_offsets are kept in compact uint32 arrays
+    """
 
-                if self.progress_callback:
-                    self.progress_callback(
-                        i + 1,
-                        file_count,
-                        f"{container.name}: {shorten_display_path(filename)}",
-                    )
+    def __init__(self, names: List[str], offsets: array, sizes: array, meta_offsets: array, entry_name_size: int = 0x80, metadata_crc: int = 0):
+        self.names = names
+        self.offsets = offsets
+        self.sizes = sizes
+        self.meta_offsets = meta_offsets
+        self.entry_name_size = entry_name_size
+        # crc32 of the metadata block the table was decoded from, changes whenever the TOC does
+        self.metadata_crc = metadata_crc
+
+    @classmethod
+    def from_file(cls, f, profile: GameProfile, container: Optional[ContainerProfile] = None) -> "PakIndex":
+        stride = profile.entry_name_size + PAK_ENTRY_TAIL_SIZE
+        f.seek(0)
 
-                f.seek(return_pos)
+        # read the known metadata block in one call, fall back to the header when the profile has no size
+        first_read = container.metadata_size if container and container.metadata_size else PAK_HEADER_SIZE
+        block = f.read(max(first_read, PAK_HEADER_SIZE))
 
+        source = getattr(f, "name", "PAK container")
+        sig = block[:4]
+        if sig != profile.signature:
+            raise ValueError(f"Invalid signature in {source}: expected {profile.signature!r}, got {sig!r}")
+        if len(block) < PAK_HEADER_SIZE:
+            raise ValueError(f"PAK header is truncated in {source}.")
 
-class ModManagerLogic:
-    def __init__(self, profile: Optional[GameProfile] = None, game_folder: Optional[str] = None):
-        self.profile = profile or GAME_PROFILES["ascension"]
-        self.game_folder = game_folder
-        self.ledger_path = project_path(f"applied_mods_{self.profile.key}.txt")
-        ensure_backups(self.profile, self.game_folder)
+        file_count = int.from_bytes(block[8:12], "little")
+        metadata_size = PAK_HEADER_SIZE + file_count * stride
+        if len(block) < metadata_size:
+            block += f.read(metadata_size - len(block))
+        if len(block) < metadata_size:
+            raise ValueError(f"PAK metadata is truncated in {source}: expected {metadata_size} bytes, got {len(block)}")
+
+        return cls.from_bytes(block, profile, file_count)
+
+    @classmethod
+    def from_bytes(cls, block: bytes, profile: GameProfile, file_count: Optional[int] = None) -> "PakIndex":
+        """
+        Decodes a metadata block (header included) that is already in memory
+        """
+        if file_count is None:
+            file_count = int.from_bytes(block[8:12], "little")
+        name_size = profile.entry_name_size
+        stride = name_size + PAK_ENTRY_TAIL_SIZE
+        end = PAK_HEADER_SIZE + file_count * stride
+
+        names: List[str] = []
+        offsets = array("I")
+        sizes = array("I")
+        encoding = profile.encoding
+
+        for i, (filename_raw, file_offset, file_size) in enumerate(struct.iter_unpack(f"<{name_size}sII", block[PAK_HEADER_SIZE:end])):
+            clean_bytes = filename_raw.split(b"\x00", 1)[0]
+            names.append(clean_bytes.decode(encoding, errors="ignore") or f"unnamed_{i:06d}.bin")
+            offsets.append(file_offset)
+            sizes.append(file_size)
+
+        meta_offsets = array("I", range(PAK_HEADER_SIZE, end, stride))
+        return cls(names, offsets, sizes, meta_offsets, name_size, zlib.crc32(block[:end]))
+
+    @classmethod
+    def read(cls, pak_path: str, profile: GameProfile, container: Optional[ContainerProfile] = None) -> "PakIndex":
+        with open(pak_path, "rb") as f:
+            return cls.from_file(f, profile, container)
 
     @property
-    def containers(self) -> Dict[int, str]:
-        return {c.cid: game_path(self.game_folder, c.name) for c in self.profile.containers}
+    def metadata_size(self) -> int:
+        return PAK_HEADER_SIZE + len(self.names) * (self.entry_name_size + PAK_ENTRY_TAIL_SIZE)
 
-    def get_applied_mods(self) -> set:
-        if not os.path.exists(self.ledger_path):
-            return set()
+    def save_cache(self, cache_path: str, container_size: int, mtime_ns: int) -> None:
+        """
+        Writes the table as a header followed by the raw uint32 arrays and a NUL separated name blob
+        """
+        names_blob = "\0".join(self.names).encode("utf-8")
+        arrays = [self.offsets, self.sizes, self.meta_offsets]
+        if sys.byteorder == "big":
+            arrays = [array("I", a) for a in arrays]
+            for a in arrays:
+                a.byteswap()
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_CACHE_HEADER.pack(
+                INDEX_CACHE_MAGIC, INDEX_CACHE_VERSION, container_size, mtime_ns,
+                self.metadata_crc, len(self.names), self.entry_name_size, len(names_blob),
+            ))
+            for a in arrays:
+                f.write(a.tobytes())
+            f.write(names_blob)
+        os.replace(tmp_path, cache_path)
+
+    @classmethod
+    def load_cache(cls, cache_path: str) -> Optional[Tuple["PakIndex", int, int]]:
+        """
+        Returns (index, container_size, mtime_ns) from a cache file, None if it is missing or unreadable
+        """
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < INDEX_CACHE_HEADER.size:
+            return None
+
+        magic, version, container_size, mtime_ns, metadata_crc, count, name_size, names_len = INDEX_CACHE_HEADER.unpack_from(data)
+        if magic != INDEX_CACHE_MAGIC or version != INDEX_CACHE_VERSION:
+            return None
+        pos = INDEX_CACHE_HEADER.size
+        if len(data) != pos + count * 12 + names_len:
+            return None
+
+        arrays = []
+        for _ in range(3):
+            a = array("I")
+            a.frombytes(data[pos:pos + count * 4])
+            if sys.byteorder == "big":
+                a.byteswap()
+            arrays.append(a)
+            pos += count * 4
+        names = data[pos:pos + names_len].decode("utf-8").split("\0") if count else []
+        if len(names) != count:
+            return None
+
+        return cls(names, arrays[0], arrays[1], arrays[2], name_size, metadata_crc), container_size, mtime_ns
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def entry(self, i: int) -> PakEntry:
+        return PakEntry(i, self.names[i], self.offsets[i], self.sizes[i], self.meta_offsets[i])
+
+    def __iter__(self) -> Iterator[PakEntry]:
+        for i in range(len(self.names)):
+            yield PakEntry(i, self.names[i], self.offsets[i], self.sizes[i], self.meta_offsets[i])
+
+    def offset_order(self) -> List[int]:
+        """
+        Entry indices sorted by their data offset, so the container can be read front to back
+        """
+        offsets = self.offsets
+        return sorted(range(len(offsets)), key=offsets.__getitem__)
 
-        with open(self.ledger_path, "r", encoding="utf-8") as f:
-            mods = {line.strip() for line in f if line.strip()}
 
-        existing_mods = {m for m in mods if os.path.exists(project_path("Mods", m))}
-        if len(existing_mods) != len(mods):
-            with open(self.ledger_path, "w", encoding="utf-8") as f:
-                for m in sorted(existing_mods):
-                    f.write(f"{m}\n")
-        return existing_mods
+class PakEntryReader(io.RawIOBase):
+    """
+    Read only file-like view over one entry, data is fetched from the container only when read
+    """
 
-    def update_ledger(self, mod_name: str, add: bool = True) -> None:
-        mods = self.get_applied_mods()
-        if add:
-            mods.add(mod_name)
-        else:
-            mods.discard(mod_name)
-        with open(self.ledger_path, "w", encoding="utf-8") as f:
-            for m in sorted(mods):
-                f.write(f"{m}\n")
+    def __init__(self, archive: "PakArchive", entry: PakEntry):
+        super().__init__()
+        self.archive = archive
+        self.entry = entry
+        self.name = entry.name
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), self.entry.file_size - self.pos)
+        if count <= 0:
+            return 0
+        data = self.archive.read_at(self.entry.file_offset + self.pos, count)
+        buffer[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.entry.file_size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self.pos = offset
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+
+class PakArchive:
+    """
+    Read only access to a container's entries without unpacking them to disk
 
-    def get_mod_header(self, mod_path: str):
-        with open(mod_path, "rb") as f:
-            sig_len_raw = f.read(1)
-            if not sig_len_raw:
-                return None
-            sig_len = int.from_bytes(sig_len_raw, "little")
-            if f.read(sig_len) != MOD_SIGNATURE:
-                return None
+    The container is opened once and its TOC indexed, names are looked up through a dict
+    (case insensitive, / or \\ separators). A modded container works the same way since its
+    TOC already points at the appended data.
+    """
 
-            file_count = int.from_bytes(f.read(4), "little")
+    def __init__(self, pak_path: str, profile: Optional[GameProfile] = None, container: Optional[ContainerProfile] = None, index: Optional[PakIndex] = None):
+        self.path = pak_path
+        self.profile = profile or GAME_PROFILES["ascension"]
+        self.file = open(pak_path, "rb")
+        self.lock = threading.Lock()
+        self.dirs: Optional[Dict[str, set]] = None
+        try:
+            self.index = index if index is not None else PakIndex.from_file(self.file, self.profile, container)
+        except Exception:
+            self.file.close()
+            raise
 
-            def read_prefixed_string(size_bytes):
-                length = int.from_bytes(f.read(size_bytes), "little")
-                return f.read(length).decode("utf-8", errors="ignore")
+        self.lookup: Dict[str, int] = {}
+        for i, name in enumerate(self.index.names):
+            # the first entry wins if the TOC repeats a name
+            self.lookup.setdefault(self.normalize(name), i)
 
-            meta = {
-                "author": read_prefixed_string(1),
-                "version": read_prefixed_string(1),
-                "description": read_prefixed_string(2),
-            }
+    @classmethod
+    def for_container(cls, profile: GameProfile, container: ContainerProfile, game_folder: Optional[str] = None) -> "PakArchive":
+        index = load_pak_index(profile, container, game_folder)
+        return cls(game_path(game_folder, container.name), profile, container, index)
 
-            img_count = int.from_bytes(f.read(1), "little")
-            images = []
-            for _ in range(img_count):
-                img_size = int.from_bytes(f.read(4), "little")
-                images.append(f.read(img_size))
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.replace("\\", "/").strip("/").lower()
 
-            return {"meta": meta, "images": images, "file_count": file_count}
+    def close(self) -> None:
+        self.file.close()
 
-    def calculate_payload_offset(self, f) -> int:
-        f.seek(0)
-        sig_len = int.from_bytes(f.read(1), "little")
-        f.seek(sig_len, 1)
-        f.seek(4, 1)  # file count
-        for _ in range(2):
-            f.seek(int.from_bytes(f.read(1), "little"), 1)
-        f.seek(int.from_bytes(f.read(2), "little"), 1)
-        img_count = int.from_bytes(f.read(1), "little")
-        for _ in range(img_count):
-            f.seek(int.from_bytes(f.read(4), "little"), 1)
-        return f.tell()
+    def __enter__(self) -> "PakArchive":
+        return self
 
-    def apply_mod(self, mod_path: str):
-        mod_name = os.path.basename(mod_path)
-        header = self.get_mod_header(mod_path)
-        if not header:
-            return False, "Invalid Mod"
+    def __exit__(self, *_exc) -> None:
+        self.close()
 
-        with open(mod_path, "rb") as mod_f:
-            mod_f.seek(self.calculate_payload_offset(mod_f))
-
-            for _ in range(header["file_count"]):
-                file_size = int.from_bytes(mod_f.read(4), "little")
-                file_data = mod_f.read(file_size)
-                cont_id, meta_offset, orig_off, orig_size, tail_size = unpack_taildata(file_data)
-                target_pak = self.containers.get(cont_id)
-
-                if not target_pak or not os.path.exists(target_pak):
-                    return False, f"Missing container for id {cont_id}: {target_pak}"
-
-                payload = file_data[:-tail_size]
-                with open(target_pak, "r+b") as pak:
-                    pak.seek(0, 2)
-                    new_offset = pak.tell()
-                    pak.write(payload)
-                    pak.seek(meta_offset + self.profile.entry_name_size)
-                    pak.write(struct.pack("<II", new_offset, len(payload)))
-
-        self.update_ledger(mod_name, add=True)
-        return True, "Mod Applied"
+    def __len__(self) -> int:
+        return len(self.index)
 
-    def disable_mod(self, mod_path: str):
-        mod_name = os.path.basename(mod_path)
-        header = self.get_mod_header(mod_path)
-        if not header:
-            return False, "Invalid Mod"
+    def __contains__(self, name: str) -> bool:
+        return self.normalize(name) in self.lookup
 
-        with open(mod_path, "rb") as mod_f:
-            mod_f.seek(self.calculate_payload_offset(mod_f))
-            for _ in range(header["file_count"]):
-                file_size = int.from_bytes(mod_f.read(4), "little")
-                file_data = mod_f.read(file_size)
-                cont_id, meta_offset, orig_off, orig_size, _tail_size = unpack_taildata(file_data)
-                target_pak = self.containers.get(cont_id)
-                if not target_pak or not os.path.exists(target_pak):
-                    return False, f"Missing container for id {cont_id}: {target_pak}"
-                with open(target_pak, "r+b") as pak:
-                    pak.seek(meta_offset + self.profile.entry_name_size)
-                    pak.write(struct.pack("<II", orig_off, orig_size))
-
-        self.update_ledger(mod_name, add=False)
-        return True, "Mod Disabled"
+    def read_at(self, offset: int, size: int) -> bytes:
+        if hasattr(os, "pread"):
+            return os.pread(self.file.fileno(), size, offset)
+        with self.lock:
+            self.file.seek(offset)
+            return self.file.read(size)
 
-    def disable_all(self):
-        game_backup_folder = project_path(BACKUP_FOLDER, self.profile.key)
+    def stat(self, name: str) -> PakEntry:
+        i = self.lookup.get(self.normalize(name))
+        if i is None:
+            raise FileNotFoundError(f"{name} is not in {os.path.basename(self.path)}")
+        return self.index.entry(i)
 
-        for container in self.profile.containers:
-            backup_path = os.path.join(game_backup_folder, container.name)
+    def open(self, name: str) -> PakEntryReader:
+        return PakEntryReader(self, self.stat(name))
 
-            if not os.path.exists(backup_path):
-                messagebox.showerror("Error", f"Backup not found for {container.name}. Cannot restore original metadata.")
-                continue
+    def read(self, name: str) -> bytes:
+        entry = self.stat(name)
+        return self.read_at(entry.file_offset, entry.file_size)
 
-            target_container = game_path(self.game_folder, container.name)
+    def namelist(self) -> List[str]:
+        return list(self.index.names)
 
-            if not os.path.exists(target_container):
-                continue
+    def listdir(self, path: str = "") -> List[str]:
+        """
+        Names directly inside path, sub folders are listed with a trailing /
+        """
+        if self.dirs is None:
+            dirs: Dict[str, set] = {}
+            for name in self.index.names:
+                parts = name.replace("\\", "/").strip("/").split("/")
+                for depth in range(len(parts)):
+                    parent = "/".join(parts[:depth]).lower()
+                    child = parts[depth] + ("/" if depth < len(parts) - 1 else "")
+                    dirs.setdefault(parent, set()).add(child)
+            self.dirs = dirs
+
+        key = self.normalize(path)
+        if key not in self.dirs:
+            raise FileNotFoundError(f"{path} is not a folder in {os.path.basename(self.path)}")
+        return sorted(self.dirs[key])
+
+
+class EntryFilter:
+    """
+    Include/exclude matcher for TOC entry names
 
-            if container.metadata_size is None or container.vanilla_size is None:
-                messagebox.showwarning(
-                    "Profile Incomplete",
-                    f"{self.profile.display_name} profile needs metadata_size and vanilla_size for {container.name} before Disable All can truncate safely.",
-                )
-                continue
+    Patterns are globs (ui/*.tga, button*), extensions (.xml) or regexes prefixed with re:,
+    matching is case insensitive and globs without a slash also match the bare file name
 
-            try:
-                with open(backup_path, "rb") as bf:
-                    original_meta = bf.read(container.metadata_size)
-                with open(target_container, "r+b") as f:
-                    f.seek(0)
-                    f.write(original_meta)
-                    f.truncate(container.vanilla_size)
-            except Exception as e:
-                messagebox.showerror("Hard Reset Failed", f"Failed to restore {container.name}: {e}")
-                return False, str(e)
+    A pattern string is split on ;, commas and newlines so names with spaces can be matched, a list is taken as is
+    """
 
-        if os.path.exists(self.ledger_path):
-            os.remove(self.ledger_path)
+    def __init__(self, include=None, exclude=None):
+        self.include_patterns = self.split_patterns(include)
+        self.exclude_patterns = self.split_patterns(exclude)
+        self.include = [self.compile_pattern(p) for p in self.include_patterns]
+        self.exclude = [self.compile_pattern(p) for p in self.exclude_patterns]
+
+    @staticmethod
+    def split_patterns(patterns) -> List[str]:
+        if not patterns:
+            return []
+        if isinstance(patterns, str):
+            patterns = re.split(r"[;,\r\n]+", patterns)
+        return [p.strip() for p in patterns if p and p.strip()]
+
+    @staticmethod
+    def compile_pattern(pattern: str):
+        if pattern.lower().startswith("re:"):
+            return re.compile(pattern[3:], re.IGNORECASE).search, False
+        if pattern.startswith(".") and not any(ch in pattern for ch in "*?[/\\"):
+            pattern = "*" + pattern
+        pattern = pattern.replace("\\", "/")
+        return re.compile(fnmatch.translate(pattern), re.IGNORECASE).match, "/" not in pattern
+
+    @staticmethod
+    def test(rules, name: str) -> bool:
+        base = name.rsplit("/", 1)[-1]
+        return any(match(base if on_base else name) or (on_base and match(name)) for match, on_base in rules)
 
-        return True, "All mods cleared. Metadata and file sizes restored where profile sizes were available."
+    @property
+    def active(self) -> bool:
+        return bool(self.include or self.exclude)
 
+    @property
+    def key(self) -> str:
+        return "|".join(self.include_patterns) + "!" + "|".join(self.exclude_patterns)
 
-class ModPacker:
-    def validate_taildata(self, file_path: str) -> bool:
-        if os.path.getsize(file_path) < TAILDATA_LEGACY_SIZE:
-            return False
-        with open(file_path, "rb") as f:
-            data = f.read()
-        try:
-            unpack_taildata(data)
-            return True
-        except Exception:
+    def matches(self, name: str) -> bool:
+        name = name.replace("\\", "/")
+        if self.include and not self.test(self.include, name):
             return False
+        return not (self.exclude and self.test(self.exclude, name))
 
-    def read_taildata_bytes(self, source_path: str) -> bytes:
-        if not os.path.exists(source_path):
-            raise FileNotFoundError(f"Source missing: {os.path.basename(source_path)}")
-        with open(source_path, "rb") as s:
-            data = s.read()
-        _cid, _meta, _off, _size, tail_size = unpack_taildata(data)
-        return data[-tail_size:]
-
-    def strip_existing_taildata(self, target_path: str) -> None:
+    def select(self, index: "PakIndex", order: Iterable[int]) -> List[int]:
         """
-        Removes existing Ingelmia taildata from a target file if it already has it,
-        This makes batch updates safe to run again without stacking taildata twice
+        Keeps the entries of order whose names pass the filter, only the parsed TOC is looked at
         """
-        with open(target_path, "rb") as f:
-            data = f.read()
+        names = index.names
+        return [i for i in order if self.matches(names[i])]
 
-        try:
-            *_unused, tail_size = unpack_taildata(data)
-        except Exception:
-            return
 
-        with open(target_path, "wb") as f:
-            f.write(data[:-tail_size])
+def index_cache_path(profile: GameProfile, container: ContainerProfile) -> str:
+    return project_path(BACKUP_FOLDER, profile.key, f"{container.name}.idx")
 
-    def transfer_taildata(self, target_path: str, source_path: str, replace_existing: bool = False):
-        try:
-            taildata = self.read_taildata_bytes(source_path)
-            if replace_existing:
-                self.strip_existing_taildata(target_path)
-            with open(target_path, "ab") as t:
-                t.write(taildata)
-            return True, "OK"
-        except Exception as e:
-            return False, str(e)
 
-    def collect_files_by_basename(self, folder: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
-        matches: Dict[str, str] = {}
-        duplicates: Dict[str, List[str]] = {}
+def load_pak_index(profile: GameProfile, container: ContainerProfile, game_folder: Optional[str] = None, use_cache: bool = True) -> PakIndex:
+    """
+    Returns the container's TOC table, going through the cache in Backups/<game>/
 
-        for root, _dirs, files in os.walk(folder):
-            for filename in files:
-                full_path = os.path.join(root, filename)
-                key = filename.lower()
-                if key in matches:
-                    duplicates.setdefault(key, [matches[key]]).append(full_path)
-                else:
-                    matches[key] = full_path
+    A cache whose container size and mtime still match is used without touching the container,
+    otherwise the metadata block is read and the cache is reused if its crc32 is unchanged,
+    the table is only decoded again when the TOC itself changed
+    """
+    pak_path = game_path(game_folder, container.name)
+    if not use_cache:
+        return PakIndex.read(pak_path, profile, container)
+
+    cache_path = index_cache_path(profile, container)
+    st = os.stat(pak_path)
+    cached = PakIndex.load_cache(cache_path)
+    if cached:
+        index, cached_size, cached_mtime = cached
+        # a container written in the same timestamp tick the cache was saved could have changed without its mtime moving
+        if (cached_size == st.st_size and cached_mtime == st.st_mtime_ns and index.entry_name_size == profile.entry_name_size
+                and cached_mtime < os.stat(cache_path).st_mtime_ns):
+            return index
+
+    fresh = PakIndex.read(pak_path, profile, container)
+    if cached and cached[0].metadata_crc == fresh.metadata_crc and len(cached[0]) == len(fresh):
+        fresh = cached[0]
+    try:
+        fresh.save_cache(cache_path, st.st_size, st.st_mtime_ns)
+    except OSError:
+        # a read only project folder just means no cache
+        pass
+    return fresh
 
-        for key in duplicates:
-            matches.pop(key, None)
 
-        return matches, duplicates
+def vanilla_pak_index(profile: GameProfile, container: ContainerProfile, game_folder: Optional[str] = None) -> PakIndex:
+    """
+    Returns the TOC as shipped, once mods have been appended to the container it is read from the backup
+    """
+    pak_path = game_path(game_folder, container.name)
+    if container.vanilla_size and os.path.getsize(pak_path) > container.vanilla_size:
+        metadata = load_backup_metadata(profile, container)
+        if metadata:
+            return PakIndex.from_bytes(metadata, profile)
+    return load_pak_index(profile, container, game_folder)
 
-    def batch_transfer_taildata_by_filename(self, target_folder: str, source_folder: str):
-        """
-        Transfers taildata from source_folder files into target_folder files by matching basename
-        Returns success_count, skipped_count, errors
-        """
-        if not os.path.isdir(target_folder):
-            return 0, 0, [f"Target folder missing: {target_folder}"]
-        if not os.path.isdir(source_folder):
-            return 0, 0, [f"Source folder missing: {source_folder}"]
 
-        source_files, source_duplicates = self.collect_files_by_basename(source_folder)
-        success_count = 0
-        skipped_count = 0
-        errors: List[str] = []
+def digest_bytes(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=MANIFEST_DIGEST_SIZE).digest()
 
-        for root, _dirs, files in os.walk(target_folder):
-            for filename in files:
-                target_path = os.path.join(root, filename)
-                key = filename.lower()
 
-                if key in source_duplicates:
-                    skipped_count += 1
-                    errors.append(f"{filename}: skipped because multiple source files share this name")
-                    continue
+class ContainerManifest:
+    """
+    Known good fingerprint of a vanilla container: a digest of the metadata block, digests of the data region
+    in VERIFY_CHUNK pieces and a crc32 per TOC entry, kept in Backups/<game>/<container>.manifest
+    """
 
-                source_path = source_files.get(key)
-                if not source_path:
-                    skipped_count += 1
-                    errors.append(f"{filename}: no matching original file found")
-                    continue
+    def __init__(self, metadata_size: int, vanilla_size: int, chunk_size: int, metadata_digest: bytes, chunks: List[bytes], entries: List[Tuple[int, int, int]]):
+        self.metadata_size = metadata_size
+        self.vanilla_size = vanilla_size
+        self.chunk_size = chunk_size
+        self.metadata_digest = metadata_digest
+        self.chunks = chunks
+        self.entries = entries
+
+    @classmethod
+    def build(cls, data_path: str, metadata: bytes, profile: GameProfile, vanilla_size: int, workers: int = DEFAULT_VERIFY_WORKERS,
+              progress_callback: Optional[Callable[[int, int], None]] = None) -> "ContainerManifest":
+        """
+        metadata is the vanilla block from the backup, data_path only has to hold vanilla bytes up to vanilla_size
+        """
+        index = PakIndex.from_bytes(metadata, profile)
+        with ContainerHasher(data_path, workers, vanilla_size) as hasher:
+            chunks = hasher.chunk_digests(len(metadata), vanilla_size, VERIFY_CHUNK, progress_callback)
+            entries = [(off, size) for off, size in zip(index.offsets, index.sizes)]
+            crcs = hasher.entry_crcs(entries)
+        return cls(len(metadata), vanilla_size, VERIFY_CHUNK, digest_bytes(metadata), chunks, [(off, size, crc) for (off, size), crc in zip(entries, crcs)])
+
+    @classmethod
+    def load(cls, path: str) -> Optional["ContainerManifest"]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, metadata_size, vanilla_size, chunk_size, chunk_count, entry_count, metadata_digest = MANIFEST_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return None
+        if magic != MANIFEST_MAGIC or version != MANIFEST_VERSION:
+            return None
+        pos = MANIFEST_HEADER.size
+        if len(data) != pos + chunk_count * MANIFEST_DIGEST_SIZE + entry_count * MANIFEST_ENTRY.size:
+            return None
+        chunks = [data[p:p + MANIFEST_DIGEST_SIZE] for p in range(pos, pos + chunk_count * MANIFEST_DIGEST_SIZE, MANIFEST_DIGEST_SIZE)]
+        pos += chunk_count * MANIFEST_DIGEST_SIZE
+        entries = list(MANIFEST_ENTRY.iter_unpack(data[pos:]))
+        return cls(metadata_size, vanilla_size, chunk_size, metadata_digest, chunks, entries)
+
+    def region_hash(self) -> bytes:
+        """
+        One digest over the chunk digests, it stands for the whole vanilla data region
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        digest.update(struct.pack("<QQI", self.metadata_size, self.vanilla_size, self.chunk_size))
+        for chunk in self.chunks:
+            digest.update(chunk)
+        return digest.digest()
+
+    def save(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MANIFEST_HEADER.pack(
+                MANIFEST_MAGIC, MANIFEST_VERSION, self.metadata_size, self.vanilla_size,
+                self.chunk_size, len(self.chunks), len(self.entries), self.metadata_digest,
+            ))
+            f.write(b"".join(self.chunks))
+            for entry in self.entries:
+                f.write(MANIFEST_ENTRY.pack(*entry))
+        os.replace(tmp_path, path)
+
+
+class ContainerHasher:
+    """
+    Hashes a container through one read only mmap on a thread pool, hashlib and zlib drop the GIL
+    on large buffers so the chunks really are hashed in parallel
 
-                success, msg = self.transfer_taildata(target_path, source_path)
-                if success:
-                    success_count += 1
-                else:
-                    skipped_count += 1
-                    errors.append(f"{filename}: {msg}")
+    Only [0, limit) is mapped, on Windows a mapped file can't be shrunk below the mapping so the mod data
+    past vanilla_size has to stay free for truncates
+    """
 
-        return success_count, skipped_count, errors
+    def __init__(self, path: str, workers: int = DEFAULT_VERIFY_WORKERS, limit: Optional[int] = None):
+        self.file = open(path, "rb")
+        self.size = os.fstat(self.file.fileno()).st_size
+        if limit is not None:
+            self.size = min(self.size, limit)
+        self.map = mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ) if self.size else None
+        self.view = memoryview(self.map) if self.map is not None else memoryview(b"")
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self) -> "ContainerHasher":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def digest_range(self, start: int, end: int) -> bytes:
+        with self.view[start:min(end, self.size)] as piece:
+            return digest_bytes(piece)
+
+    def chunk_digests(self, start: int, end: int, chunk_size: int, progress_callback: Optional[Callable[[int, int], None]] = None) -> List[bytes]:
+        """
+        Digests of [start, end) in chunk_size pieces, a piece past the end of the file digests whatever is there
+        """
+        bounds = [(pos, min(pos + chunk_size, end)) for pos in range(start, end, chunk_size)]
+        digests = []
+        for (pos, stop), digest in zip(bounds, self.pool.map(lambda b: self.digest_range(*b), bounds)):
+            digests.append(digest)
+            if progress_callback:
+                progress_callback(stop - start, end - start)
+        return digests
+
+    def crc_batch(self, entries: List[Tuple[int, int]]) -> List[int]:
+        crcs = []
+        for off, size in entries:
+            if off + size > self.size:
+                crcs.append(-1)
+                continue
+            with self.view[off:off + size] as piece:
+                crcs.append(zlib.crc32(piece))
+        return crcs
 
-    def create_package(self, meta, files: Iterable[str], output_path: str, image_paths: List[str] = None):
-        image_paths = image_paths or []
-        try:
-            with open(output_path, "wb") as f:
-                f.write(len(MOD_SIGNATURE).to_bytes(1, "little"))
-                f.write(MOD_SIGNATURE)
-                files = list(files)
-                f.write(len(files).to_bytes(4, "little"))
+    def entry_crcs(self, entries: List[Tuple[int, int]]) -> List[int]:
+        """
+        crc32 of each (offset, size), -1 for entries that run past the end of the file
+        """
+        batches = [[]]
+        batch_bytes = 0
+        for entry in entries:
+            if batch_bytes >= VERIFY_BATCH:
+                batches.append([])
+                batch_bytes = 0
+            batches[-1].append(entry)
+            batch_bytes += entry[1]
+        crcs = []
+        for batch in self.pool.map(self.crc_batch, batches):
+            crcs.extend(batch)
+        return crcs
+
+
+class VerifyResult(NamedTuple):
+    container: str
+    state: str  # "vanilla", "modded", "corrupted" or "missing"
+    detail: str
+    bad_chunks: Tuple[int, ...] = ()
+    bad_entries: Tuple[str, ...] = ()
+    modded_entries: int = 0
+
+
+def manifest_path(profile: GameProfile, container: ContainerProfile) -> str:
+    return project_path(BACKUP_FOLDER, profile.key, f"{container.name}.manifest")
+
+
+def load_manifest(profile: GameProfile, container: ContainerProfile, game_folder: Optional[str] = None, workers: int = DEFAULT_VERIFY_WORKERS,
+                  progress_callback: Optional[Callable[[int, int], None]] = None) -> Optional[ContainerManifest]:
+    """
+    The container's manifest, built on first use from the metadata backup and the vanilla data region,
+    None when there is no backup to vouch for the vanilla TOC
 
-                author_bytes = meta.get("author", "").encode("utf-8")[:255]
-                f.write(len(author_bytes).to_bytes(1, "little"))
-                f.write(author_bytes)
+    A rebuilt manifest has to match the region hash the backup took from the first one, otherwise the data
+    region changed since then and it is not saved as the reference, neither is one built from a container
+    shorter than its vanilla data
+    """
+    path = manifest_path(profile, container)
+    manifest = ContainerManifest.load(path)
+    if manifest:
+        return manifest
+    meta_path, full_path = backup_paths(profile, container)
+    backup = ContainerBackup.load(meta_path)
+    if backup is None:
+        return None
+    data_path = full_path if os.path.exists(full_path) else game_path(game_folder, container.name)
+    if os.path.getsize(data_path) < backup.vanilla_size:
+        raise ValueError(f"{container.name} is shorter than its vanilla data, restore the game files before verifying")
+    manifest = ContainerManifest.build(data_path, backup.metadata, profile, backup.vanilla_size, workers, progress_callback)
+    if backup.vanilla_hash is not None and manifest.region_hash() != backup.vanilla_hash:
+        raise ValueError(f"The vanilla data of {container.name} no longer matches its backup, restore the game files before verifying")
+    if any(crc < 0 for _off, _size, crc in manifest.entries):
+        raise ValueError(f"Vanilla TOC entries of {container.name} run past the end of its data, restore the game files before verifying")
+    try:
+        manifest.save(path)
+    except (OSError, struct.error):
+        pass
+    return manifest
+
+
+def verify_container(profile: GameProfile, container: ContainerProfile, game_folder: Optional[str] = None, workers: int = DEFAULT_VERIFY_WORKERS,
+                     progress_callback: Optional[Callable[[int, int, str], None]] = None) -> VerifyResult:
+    """
+    Classifies a container as vanilla, modded (intact vanilla data, TOC or size changed by mods) or corrupted,
+    vanilla data is checked chunk by chunk and every TOC entry still pointing at it is checked against its crc
+    """
+    pak_path = game_path(game_folder, container.name)
+    if not os.path.exists(pak_path):
+        return VerifyResult(container.name, "missing", f"{container.name} not found")
+    report = (lambda done, total: progress_callback(done, total, container.name)) if progress_callback else None
+    try:
+        manifest = load_manifest(profile, container, game_folder, workers, report)
+    except (ValueError, struct.error) as e:
+        return VerifyResult(container.name, "corrupted", str(e))
+    if manifest is None:
+        return VerifyResult(container.name, "corrupted", f"No backup of {container.name} to verify against")
+
+    size = os.path.getsize(pak_path)
+    if size < manifest.vanilla_size:
+        return VerifyResult(container.name, "corrupted", f"{container.name} is {manifest.vanilla_size - size} bytes shorter than vanilla")
+    try:
+        index = PakIndex.read(pak_path, profile, container)
+    except ValueError as e:
+        return VerifyResult(container.name, "corrupted", str(e))
+    if len(index) != len(manifest.entries):
+        return VerifyResult(container.name, "corrupted", f"TOC holds {len(index)} entries, vanilla has {len(manifest.entries)}")
+
+    with ContainerHasher(pak_path, workers, manifest.vanilla_size) as hasher:
+        metadata_same = hasher.digest_range(0, manifest.metadata_size) == manifest.metadata_digest
+        chunks = hasher.chunk_digests(manifest.metadata_size, manifest.vanilla_size, manifest.chunk_size, report)
+        bad_chunks = tuple(i for i, (digest, expected) in enumerate(zip(chunks, manifest.chunks)) if digest != expected)
+
+        bad_entries = []
+        modded = 0
+        vanilla_entries = []
+        for i, entry in enumerate(index):
+            vanilla_off, vanilla_size, _crc = manifest.entries[i]
+            if entry.file_offset >= manifest.vanilla_size:
+                modded += 1
+                if entry.file_offset + entry.file_size > size:
+                    bad_entries.append(entry.name)
+            elif (entry.file_offset, entry.file_size) == (vanilla_off, vanilla_size):
+                vanilla_entries.append(i)
+            else:
+                bad_entries.append(entry.name)
+        crcs = hasher.entry_crcs([(index.offsets[i], index.sizes[i]) for i in vanilla_entries])
+        bad_entries.extend(index.names[i] for i, crc in zip(vanilla_entries, crcs) if crc != manifest.entries[i][2])
+
+    if bad_chunks or bad_entries:
+        detail = f"{len(bad_chunks)} damaged data chunks, {len(bad_entries)} bad entries"
+        return VerifyResult(container.name, "corrupted", detail, bad_chunks, tuple(bad_entries), modded)
+    if metadata_same and size == manifest.vanilla_size:
+        return VerifyResult(container.name, "vanilla", "Matches the vanilla manifest")
+    return VerifyResult(container.name, "modded", f"{modded} entries point at mod data, {size - manifest.vanilla_size} bytes appended", modded_entries=modded)
+
+
+def iter_sequential_entries(f, index: PakIndex, order: Optional[Iterable[int]] = None, read_size: int = UNPACK_READ_SIZE) -> Iterator[Tuple[PakEntry, memoryview]]:
+    """
+    Streams entry data in offset order using large aligned reads,
+    each entry is handed out as a memoryview slice of the current read window
+    """
+    if order is None:
+        order = index.offset_order()
+
+    window = b""
+    window_start = 0
+    window_view = memoryview(window)
+
+    for i in order:
+        entry = index.entry(i)
+        start = entry.file_offset
+        end = start + entry.file_size
+
+        if start < window_start or end > window_start + len(window):
+            window_start = start - (start % UNPACK_READ_ALIGN)
+            length = max(read_size, end - window_start)
+            length += -length % UNPACK_READ_ALIGN
+            f.seek(window_start)
+            window = f.read(length)
+            window_view = memoryview(window)
+
+        yield entry, window_view[start - window_start:end - window_start]
+
+
+def iter_mapped_entries(view: memoryview, index: PakIndex, order: Optional[Iterable[int]] = None) -> Iterator[Tuple[PakEntry, memoryview]]:
+    """
+    Hands out slices of a memory mapped container, nothing is copied until the slice is written
+    """
+    if order is None:
+        order = range(len(index))
+    for i in order:
+        entry = index.entry(i)
+        yield entry, view[entry.file_offset:entry.file_offset + entry.file_size]
+
+
+class FileRange(NamedTuple):
+    """
+    A span of a container that the writer copies itself, source is an open fd or a path when writers run in other processes
+    """
+    source: object
+    offset: int
+    size: int
+
+
+def iter_range_entries(source, index: PakIndex, order: Optional[Iterable[int]] = None) -> Iterator[Tuple[PakEntry, FileRange]]:
+    if order is None:
+        order = range(len(index))
+    for i in order:
+        entry = index.entry(i)
+        yield entry, FileRange(source, entry.file_offset, entry.file_size)
+
+
+# kernel copy calls get switched off the first time the OS/filesystem rejects them
+_KERNEL_COPY = {"copy_file_range": hasattr(os, "copy_file_range"), "sendfile": hasattr(os, "sendfile")}
+_KERNEL_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.ENOTSOCK, getattr(errno, "EOPNOTSUPP", errno.ENOSYS)}
+KERNEL_COPY_AVAILABLE = any(_KERNEL_COPY.values())
+
+
+def copy_file_span(src_fd: int, offset: int, size: int, dst_fd: int) -> int:
+    """
+    Copies size bytes at offset from src_fd to the current position of dst_fd,
+    uses copy_file_range/sendfile so the data never enters Python when the OS allows it,
+    returns the number of bytes copied (short if the source ends early)
+    """
+    pos = offset
+    end = offset + size
+
+    for method in ("copy_file_range", "sendfile"):
+        if pos >= end or not _KERNEL_COPY[method]:
+            continue
+        try:
+            while pos < end:
+                if method == "copy_file_range":
+                    copied = os.copy_file_range(src_fd, dst_fd, end - pos, pos)
+                else:
+                    copied = os.sendfile(dst_fd, src_fd, pos, end - pos)
+                if copied == 0:
+                    return pos - offset
+                pos += copied
+        except OSError as e:
+            if e.errno not in _KERNEL_COPY_UNSUPPORTED:
+                raise
+            _KERNEL_COPY[method] = False
+
+    while pos < end:
+        if hasattr(os, "pread"):
+            chunk = os.pread(src_fd, min(UNPACK_READ_SIZE, end - pos), pos)
+        else:
+            # Windows has no pread, the source fd's position is moved instead
+            os.lseek(src_fd, pos, os.SEEK_SET)
+            chunk = os.read(src_fd, min(UNPACK_READ_SIZE, end - pos))
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        pos += len(chunk)
+
+    return pos - offset
+
+
+def is_already_unpacked(output_path: str, file_size: int, taildata: bytes) -> bool:
+    """
+    True when output_path already holds file_size bytes followed by exactly this taildata
+    """
+    try:
+        if os.path.getsize(output_path) != file_size + len(taildata):
+            return False
+        with open(output_path, "rb") as existing:
+            existing.seek(-len(taildata), 2)
+            return existing.read(len(taildata)) == taildata
+    except OSError:
+        return False
+
+
+class UnpackCheckpoint:
+    """
+    Remembers how far an incremental unpack got so a cancelled or killed run can resume,
+    the position counts finished entries in extraction order with nothing unfinished before them
+    """
+
+    def __init__(self, path: str, fingerprint: str, order: Iterable[int]):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.position_of = {i: pos for pos, i in enumerate(order)}
+        self.position = 0
+        self.finished = set()
+        self.unsaved = 0
+        self.lock = threading.RLock()
+
+    def load(self) -> int:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                fingerprint, position = f.read().split()
+            if fingerprint == self.fingerprint:
+                self.position = min(int(position), len(self.position_of))
+        except (OSError, ValueError):
+            self.position = 0
+        return self.position
+
+    def complete(self, i: int) -> None:
+        with self.lock:
+            self.finished.add(self.position_of[i])
+            while self.position in self.finished:
+                self.finished.discard(self.position)
+                self.position += 1
+            self.unsaved += 1
+            if self.unsaved >= UNPACK_CHECKPOINT_INTERVAL:
+                self.save()
+
+    def save(self) -> None:
+        with self.lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(f"{self.fingerprint} {self.position}\n")
+            os.replace(tmp_path, self.path)
+            self.unsaved = 0
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def write_unpacked_file(output_path: str, file_data, taildata: bytes) -> None:
+    if isinstance(file_data, FileRange):
+        src_fd = file_data.source
+        if isinstance(src_fd, str):
+            src_fd = os.open(src_fd, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            # unbuffered so the taildata lands right after the kernel copied bytes
+            with open(output_path, "wb", buffering=0) as out:
+                copy_file_span(src_fd, file_data.offset, file_data.size, out.fileno())
+                out.write(taildata)
+        finally:
+            if src_fd is not file_data.source:
+                os.close(src_fd)
+        return
+
+    with open(output_path, "wb") as out:
+        out.write(file_data)
+        out.write(taildata)
+
+
+class BackgroundUnpacker:
+    def __init__(
+        self,
+        progress_callback: Optional[Callable] = None,
+        profile: Optional[GameProfile] = None,
+        game_folder: Optional[str] = None,
+        sequential: bool = True,
+        workers: int = 1,
+        use_processes: bool = False,
+        parallel_containers: bool = False,
+        zero_copy: bool = False,
+        incremental: bool = False,
+        include=None,
+        exclude=None,
+    ):
+        self.progress_callback = progress_callback
+        self.profile = profile or GAME_PROFILES["ascension"]
+        self.game_folder = game_folder
+        # sequential extracts in data offset order instead of TOC order, avoiding a random seek per file
+        self.sequential = sequential
+        # workers > 1 hands file writes to a pool fed through a bounded queue by one reader per container
+        self.workers = max(1, workers)
+        self.use_processes = use_processes
+        self.parallel_containers = parallel_containers
+        # zero_copy copies entries with copy_file_range/sendfile, or writes slices of a memory map when those are missing
+        self.zero_copy = zero_copy
+        # incremental skips files already extracted with matching size/taildata and resumes from a checkpoint
+        self.incremental = incremental
+        # include/exclude patterns are checked against the TOC before any entry data is read
+        self.entry_filter = EntryFilter(include, exclude)
+        self.cancel_event = threading.Event()
+        self._progress_lock = threading.Lock()
+        self._container_progress: Optional[Dict[int, Tuple[int, int]]] = None
+
+    def unpack_all(self) -> None:
+        # a cancel only stops the run it was meant for, the next call resumes
+        self.cancel_event.clear()
+        ensure_backups(self.profile, self.game_folder)
+        if not self.parallel_containers or len(self.profile.containers) < 2:
+            for container in self.profile.containers:
+                self.unpack_resource(container)
+            return
+
+        # progress is reported as one combined count while the containers unpack side by side, every total
+        # is known up front from the TOCs so the combined percentage never moves backwards
+        self._container_progress = {c.cid: (0, self.planned_count(c)) for c in self.profile.containers}
+        errors: List[BaseException] = []
+
+        def run(container):
+            try:
+                self.unpack_resource(container)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(c,), daemon=True) for c in self.profile.containers]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._container_progress = None
+
+        if errors:
+            raise errors[0]
+
+    def planned_count(self, container: ContainerProfile) -> int:
+        """
+        Entries unpack_resource will count for a container, read from the TOC before anything is unpacked
+        """
+        if not os.path.exists(game_path(self.game_folder, container.name)):
+            return 0
+        index = load_pak_index(self.profile, container, self.game_folder)
+        if self.entry_filter.active:
+            return len(self.entry_filter.select(index, range(len(index))))
+        return len(index)
+
+    def cancel(self) -> None:
+        """
+        Stops the running unpack after the files already queued, incremental runs resume from there
+        """
+        self.cancel_event.set()
+
+    def report_progress(self, container: ContainerProfile, done: int, total: int, filename: str) -> None:
+        if not self.progress_callback:
+            return
+        with self._progress_lock:
+            if self._container_progress is not None:
+                self._container_progress[container.cid] = (done, total)
+                done = sum(d for d, _t in self._container_progress.values())
+                total = sum(t for _d, t in self._container_progress.values())
+            self.progress_callback(done, total, f"{container.name}: {shorten_display_path(filename)}")
+
+    def unpack_resource(self, container: ContainerProfile) -> None:
+        pak_path = game_path(self.game_folder, container.name)
+        folder_name = project_path(container.output_folder)
+
+        if not os.path.exists(pak_path):
+            messagebox.showwarning("File Missing", f"Could not find {pak_path}. Select the folder containing the game's PAK files.")
+            return
+
+        os.makedirs(folder_name, exist_ok=True)
+
+        index = load_pak_index(self.profile, container, self.game_folder)
+
+        with open(pak_path, "rb") as f:
+            order = index.offset_order() if self.sequential else list(range(len(index)))
+            if self.entry_filter.active:
+                order = self.entry_filter.select(index, order)
+            file_count = len(order)
+            checkpoint = None
+
+            if self.incremental:
+                filter_crc = zlib.crc32(self.entry_filter.key.encode("utf-8"))
+                fingerprint = f"{os.fstat(f.fileno()).st_size}-{index.metadata_crc:08x}-{int(self.sequential)}-{filter_crc:08x}"
+                checkpoint = UnpackCheckpoint(project_path(f"{container.output_folder}.checkpoint"), fingerprint, order)
+                order = self.filter_unpacked(container, folder_name, index, order, checkpoint)
+
+            try:
+                if self.zero_copy:
+                    entries = self.iter_zero_copy_entries(f, pak_path, index, order)
+                elif self.sequential:
+                    entries = iter_sequential_entries(f, index, order)
+                else:
+                    entries = self.iter_toc_entries(f, index, order)
+                self.write_entries(container, folder_name, entries, file_count, file_count - len(order), checkpoint)
+            except BaseException:
+                if checkpoint:
+                    checkpoint.save()
+                raise
+
+            if checkpoint:
+                if self.cancel_event.is_set():
+                    checkpoint.save()
+                else:
+                    checkpoint.clear()
+
+    def filter_unpacked(self, container: ContainerProfile, folder_name: str, index: PakIndex, order: List[int], checkpoint: UnpackCheckpoint) -> List[int]:
+        """
+        Drops entries that are already on disk before any container data is read,
+        entries before the checkpoint position only get their size checked, the first one missing
+        moves the checkpoint back and everything from there is checked in full
+        """
+        resume_at = checkpoint.load()
+        for pos in range(resume_at):
+            entry = index.entry(order[pos])
+            try:
+                unpacked = os.path.getsize(os.path.join(folder_name, entry.name)) == entry.file_size + TAILDATA_V2_SIZE
+            except OSError:
+                unpacked = False
+            if not unpacked:
+                resume_at = checkpoint.position = pos
+                break
+        remaining = []
+        for pos, i in enumerate(order):
+            if pos < resume_at:
+                continue
+            entry = index.entry(i)
+            taildata = pack_taildata(container.cid, entry.meta_offset, entry.file_offset, entry.file_size)
+            if is_already_unpacked(os.path.join(folder_name, entry.name), entry.file_size, taildata):
+                checkpoint.complete(i)
+            else:
+                remaining.append(i)
+        return remaining
+
+    def iter_zero_copy_entries(self, f, pak_path: str, index: PakIndex, order: List[int]):
+        if KERNEL_COPY_AVAILABLE:
+            # worker processes can't share our fd, they open the container themselves
+            source = pak_path if self.use_processes and self.workers > 1 else f.fileno()
+            yield from iter_range_entries(source, index, order)
+            return
+
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            yield from iter_mapped_entries(view, index, order)
+        finally:
+            view.release()
+            try:
+                mapped.close()
+            except BufferError:
+                # a slice is still referenced somewhere, the map closes once it is collected
+                pass
+
+    def write_entries(self, container: ContainerProfile, folder_name: str, entries, file_count: int, done: int = 0, checkpoint: Optional[UnpackCheckpoint] = None) -> None:
+        jobs = self.iter_write_jobs(container, folder_name, entries)
+        if self.workers > 1:
+            self.write_parallel(container, jobs, file_count, done, checkpoint)
+        else:
+            for entry, output_path, file_data, taildata in jobs:
+                write_unpacked_file(output_path, file_data, taildata)
+                done += 1
+                if checkpoint:
+                    checkpoint.complete(entry.index)
+                self.report_progress(container, done, file_count, entry.name)
+
+    def iter_write_jobs(self, container: ContainerProfile, folder_name: str, entries):
+        """
+        Turns (entry, data) pairs into write jobs, output folders are created once here on the reader side
+        """
+        made_dirs = set()
+        for entry, file_data in entries:
+            if self.cancel_event.is_set():
+                break
+            taildata = pack_taildata(container.cid, entry.meta_offset, entry.file_offset, entry.file_size)
+            output_path = os.path.join(folder_name, entry.name)
+            output_dir = os.path.dirname(output_path) or "."
+            if output_dir not in made_dirs:
+                os.makedirs(output_dir, exist_ok=True)
+                made_dirs.add(output_dir)
+            yield entry, output_path, file_data, taildata
+
+    def write_parallel(self, container: ContainerProfile, jobs, file_count: int, done: int = 0, checkpoint: Optional[UnpackCheckpoint] = None) -> None:
+        """
+        The calling thread reads, the pool writes, at most workers * UNPACK_QUEUE_DEPTH jobs are held in memory
+        """
+        pool_cls = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+        pending = threading.Semaphore(self.workers * UNPACK_QUEUE_DEPTH)
+        lock = threading.Lock()
+        state = {"done": done, "error": None}
+
+        def on_written(future, entry):
+            pending.release()
+            error = future.exception()
+            with lock:
+                if error is not None:
+                    state["error"] = state["error"] or error
+                    return
+                state["done"] += 1
+                if checkpoint:
+                    checkpoint.complete(entry.index)
+                self.report_progress(container, state["done"], file_count, entry.name)
+
+        with pool_cls(max_workers=self.workers) as pool:
+            for entry, output_path, file_data, taildata in jobs:
+                if state["error"] is not None:
+                    break
+                if self.use_processes and isinstance(file_data, memoryview):
+                    # memoryview slices can't be pickled
+                    file_data = bytes(file_data)
+                pending.acquire()
+                future = pool.submit(write_unpacked_file, output_path, file_data, taildata)
+                future.add_done_callback(lambda fut, entry=entry: on_written(fut, entry))
+
+        if state["error"] is not None:
+            raise state["error"]
+
+    @staticmethod
+    def iter_toc_entries(f, index: PakIndex, order: Iterable[int]) -> Iterator[Tuple[PakEntry, bytes]]:
+        for i in order:
+            entry = index.entry(i)
+            f.seek(entry.file_offset)
+            yield entry, f.read(entry.file_size)
+
+
+def mod_compressor(codec: int):
+    if codec == MOD_CODEC_ZLIB:
+        return zlib.compressobj(6)
+    if codec == MOD_CODEC_LZMA:
+        return lzma.LZMACompressor(preset=6)
+    if codec == MOD_CODEC_ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compressobj()
+    raise ValueError(f"Unsupported compression codec {codec}")
+
+
+class LimitedReader:
+    """
+    read() over the next size bytes of a file, used to keep decompressors inside one payload
+    """
+
+    def __init__(self, f, size: int):
+        self.f = f
+        self.remaining = size
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+def iter_decompressed(src, codec: int, stored_size: int, out_chunk: int = UNPACK_READ_SIZE) -> Iterator[bytes]:
+    """
+    Decompresses stored_size bytes read from src's current position,
+    yields at most out_chunk bytes at a time so memory stays bounded whatever the ratio
+    """
+    span = LimitedReader(src, stored_size)
+
+    if codec == MOD_CODEC_ZLIB:
+        d = zlib.decompressobj()
+        data = span.read(MOD_IO_CHUNK)
+        while data and not d.eof:
+            out = d.decompress(data, out_chunk)
+            if out:
+                yield out
+            data = d.unconsumed_tail or span.read(MOD_IO_CHUNK)
+        out = d.flush()
+        if out:
+            yield out
+    elif codec == MOD_CODEC_LZMA:
+        d = lzma.LZMADecompressor()
+        while not d.eof:
+            data = b""
+            if d.needs_input:
+                data = span.read(MOD_IO_CHUNK)
+                if not data:
+                    break
+            out = d.decompress(data, out_chunk)
+            if out:
+                yield out
+    elif codec == MOD_CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError("This mod uses zstd compression, install the zstandard module to apply it.")
+        reader = zstandard.ZstdDecompressor().stream_reader(span, read_size=MOD_IO_CHUNK, closefd=False)
+        while True:
+            out = reader.read(out_chunk)
+            if not out:
+                break
+            yield out
+    else:
+        raise ValueError(f"Unsupported compression codec {codec}")
+
+
+class ModEntry(NamedTuple):
+    data_offset: int  # where the payload starts inside the .attmod
+    payload_size: int  # payload bytes, taildata excluded
+    container_id: int
+    meta_offset: int
+    orig_off: int
+    orig_size: int
+    tail_size: int
+    name: str = ""  # only packages with a directory record names
+    checksum: Optional[int] = None  # crc32 of the payload, directory only
+    codec: int = MOD_CODEC_STORED
+    stored_size: Optional[int] = None  # bytes the payload takes inside the .attmod when compressed
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.container_id, self.meta_offset
+
+    @property
+    def packed_size(self) -> int:
+        return self.payload_size if self.stored_size is None else self.stored_size
+
+
+def iter_mod_payload(mod_f, entry: ModEntry) -> Iterator[bytes]:
+    """
+    Yields an entry's payload in bounded chunks, decompressing it when the package stored it compressed
+    """
+    mod_f.seek(entry.data_offset)
+    if entry.codec != MOD_CODEC_STORED:
+        yield from iter_decompressed(mod_f, entry.codec, entry.packed_size)
+        return
+
+    remaining = entry.payload_size
+    while remaining:
+        chunk = mod_f.read(min(MOD_IO_CHUNK, remaining))
+        if not chunk:
+            return
+        remaining -= len(chunk)
+        yield chunk
+
+
+def write_mod_payload(mod_f, entry: ModEntry, pak) -> None:
+    """
+    Writes an entry's payload at pak's current position, stored payloads are copied by the kernel when possible,
+    compressed ones are decompressed in chunks and checked against their crc32
+    """
+    if entry.codec == MOD_CODEC_STORED:
+        if copy_file_span(mod_f.fileno(), entry.data_offset, entry.payload_size, pak.fileno()) != entry.payload_size:
+            raise ValueError("Mod package is truncated.")
+        return
+
+    written = 0
+    crc = 0
+    for chunk in iter_mod_payload(mod_f, entry):
+        view = memoryview(chunk)
+        while view:
+            view = view[pak.write(view):]
+        crc = zlib.crc32(chunk, crc)
+        written += len(chunk)
+    if written != entry.payload_size or (entry.checksum is not None and crc != entry.checksum):
+        raise ValueError(f"{entry.name or 'Mod entry'} failed to decompress, the package is damaged.")
+
+
+class CompactionMove(NamedTuple):
+    src: int
+    dst: int
+    length: int
+    patches: Tuple[Tuple[int, int, int], ...]  # (meta_offset, new file_offset, file_size) for the entries inside the extent
+
+
+class CompactionJournal:
+    """
+    Plan and progress of an in place compaction, kept next to the backups until the run finishes
+    so an interrupted one can be rolled forward the next time the manager opens
+
+    Moves only ever copy towards the start of the file, a move that overlaps itself is copied in chunks
+    no larger than the gap and its progress is recorded after every chunk, the source bytes past the
+    recorded progress are therefore always intact
+    """
+
+    def __init__(self, path: str, moves: List[CompactionMove], final_size: int, next_move: int = 0, done: int = 0):
+        self.path = path
+        self.moves = moves
+        self.final_size = final_size
+        self.next_move = next_move
+        self.done = done
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CompactionJournal"]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, move_count, next_move, done, final_size = COMPACT_JOURNAL_HEADER.unpack_from(data)
+            if magic != COMPACT_JOURNAL_MAGIC or version != COMPACT_JOURNAL_VERSION:
+                return None
+            pos = COMPACT_JOURNAL_HEADER.size
+            moves = []
+            for _ in range(move_count):
+                src, dst, length, patch_count = COMPACT_MOVE.unpack_from(data, pos)
+                pos += COMPACT_MOVE.size
+                patches = tuple(COMPACT_PATCH.iter_unpack(data[pos:pos + patch_count * COMPACT_PATCH.size]))
+                if len(patches) != patch_count:
+                    return None
+                pos += patch_count * COMPACT_PATCH.size
+                moves.append(CompactionMove(src, dst, length, patches))
+        except (OSError, struct.error):
+            return None
+        return cls(path, moves, final_size, next_move, done)
+
+    def header(self) -> bytes:
+        return COMPACT_JOURNAL_HEADER.pack(COMPACT_JOURNAL_MAGIC, COMPACT_JOURNAL_VERSION, len(self.moves), self.next_move, self.done, self.final_size)
+
+    def save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.header())
+            for move in self.moves:
+                f.write(COMPACT_MOVE.pack(move.src, move.dst, move.length, len(move.patches)))
+                for patch in move.patches:
+                    f.write(COMPACT_PATCH.pack(*patch))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def advance(self, next_move: int, done: int) -> None:
+        """
+        Rewrites only the fixed size header in place
+        """
+        self.next_move, self.done = next_move, done
+        with open(self.path, "r+b") as f:
+            f.write(self.header())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class TocPatch(NamedTuple):
+    cid: int
+    meta_offset: int
+    old_off: int
+    old_size: int
+    new_off: int
+    new_size: int
+
+
+class TocJournal:
+    """
+    Write ahead journal of one batch of TOC patches, the old and new (offset, size) of every patched entry
+    plus the mods whose ledger update goes with them and the entry keys each of them carries
+
+    It is fsynced once before the first TOC write and marked applied once every container is fsynced,
+    a pending journal found on startup is rolled back to the old values and an applied one is rolled forward
+    by finishing the ledger update, either way recovery only touches the journalled entries
+    """
+
+    def __init__(self, path: str, patches: List[TocPatch], mod_paths: Iterable[str] = (), ledger_op: int = TOC_LEDGER_NONE,
+                 state: int = TOC_JOURNAL_PENDING, mod_keys: Optional[List[List[Tuple[int, int]]]] = None):
+        self.path = path
+        self.patches = patches
+        self.mod_paths = list(mod_paths)
+        self.ledger_op = ledger_op
+        self.state = state
+        # one list of (container_id, meta_offset) per mod path
+        self.mod_keys = mod_keys if mod_keys is not None else [[] for _ in self.mod_paths]
+
+    @classmethod
+    def load(cls, path: str) -> Optional["TocJournal"]:
+        """
+        None when the journal is missing or torn, a torn journal was never followed by a TOC write
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, state, ledger_op, paths_size, key_count, patch_count, crc = TOC_JOURNAL_HEADER.unpack_from(data)
+            if magic != TOC_JOURNAL_MAGIC or version != TOC_JOURNAL_VERSION:
+                return None
+            body = data[TOC_JOURNAL_HEADER.size:]
+            keys_size = key_count * TOC_JOURNAL_KEY.size
+            if len(body) != paths_size + keys_size + patch_count * TOC_JOURNAL_PATCH.size or zlib.crc32(body) != crc:
+                return None
+            mod_paths = body[:paths_size].decode("utf-8").split("\n") if paths_size else []
+            mod_keys = [[] for _ in mod_paths]
+            for position, cid, meta_offset in TOC_JOURNAL_KEY.iter_unpack(body[paths_size:paths_size + keys_size]):
+                mod_keys[position].append((cid, meta_offset))
+            patches = [TocPatch(*p) for p in TOC_JOURNAL_PATCH.iter_unpack(body[paths_size + keys_size:])]
+        except (OSError, struct.error, UnicodeDecodeError, IndexError):
+            return None
+        return cls(path, patches, mod_paths, ledger_op, state, mod_keys)
+
+    def body(self) -> Tuple[bytes, int, int]:
+        """
+        Journal body with the path and key counts the header records for it
+        """
+        mod_paths = "\n".join(self.mod_paths).encode("utf-8")
+        keys = [TOC_JOURNAL_KEY.pack(position, *key) for position, mod_keys in enumerate(self.mod_keys) for key in mod_keys]
+        return mod_paths + b"".join(keys) + b"".join(TOC_JOURNAL_PATCH.pack(*p) for p in self.patches), len(mod_paths), len(keys)
+
+    def save(self) -> None:
+        body, paths_size, key_count = self.body()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(TOC_JOURNAL_HEADER.pack(TOC_JOURNAL_MAGIC, TOC_JOURNAL_VERSION, self.state, self.ledger_op, paths_size,
+                                            key_count, len(self.patches), zlib.crc32(body)))
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def mark_applied(self) -> None:
+        """
+        Flips the state byte in place, the crc only covers the body so the header stays valid
+        """
+        self.state = TOC_JOURNAL_APPLIED
+        with open(self.path, "r+b") as f:
+            f.seek(5)
+            f.write(bytes([self.state]))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def by_container(self, new: bool = True) -> Dict[int, Dict[int, Tuple[int, int]]]:
+        """
+        Patches grouped per container in the shape patch_toc takes, the new values or the old ones
+        """
+        grouped: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        for p in self.patches:
+            grouped.setdefault(p.cid, {})[p.meta_offset] = (p.new_off, p.new_size) if new else (p.old_off, p.old_size)
+        return grouped
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class FreeExtents:
+    """
+    Holes in a container's appended region as (offset, length), handed out best fit
+    """
+
+    def __init__(self, extents: Iterable[Tuple[int, int]] = ()):
+        self.by_size = sorted((length, offset) for offset, length in extents if length > 0)
+
+    def __len__(self) -> int:
+        return len(self.by_size)
+
+    def take(self, size: int) -> Optional[int]:
+        """
+        Returns the offset of the smallest hole that fits size bytes and keeps whatever is left of it, None if nothing fits
+        """
+        if size <= 0:
+            return None
+        i = bisect.bisect_left(self.by_size, (size, -1))
+        if i == len(self.by_size):
+            return None
+        length, offset = self.by_size.pop(i)
+        if length > size:
+            bisect.insort(self.by_size, (length - size, offset + size))
+        return offset
+
+    def extents(self) -> List[Tuple[int, int]]:
+        return sorted((offset, length) for length, offset in self.by_size)
+
+
+class LedgerOwner(NamedTuple):
+    name: str
+    path: str
+    file_offset: Optional[int]  # None when a later mod in the same batch overrode it before it was ever written
+    file_size: Optional[int]
+    covered: bool  # a newer mod owns the entry, otherwise the TOC already points at this owner's payload
+
+
+class ModLedger:
+    """
+    Applied mods in apply order with the TOC entries each one patched, kept in SQLite so an apply or a disable
+    only inserts or deletes its own rows
+
+    Every (container_id, meta_offset) has a stack of owners ordered by apply sequence, the TOC holds the top
+    owner's payload and the rows below it record where their own payloads still sit in the container,
+    a row's offset is refreshed from the TOC the moment a newer mod covers it
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS mods (name TEXT PRIMARY KEY, path TEXT, seq INTEGER NOT NULL UNIQUE, size INTEGER, mtime_ns INTEGER)",
+        "CREATE TABLE IF NOT EXISTS entries (seq INTEGER NOT NULL, cid INTEGER NOT NULL, meta_offset INTEGER NOT NULL, "
+        "file_offset INTEGER, file_size INTEGER, PRIMARY KEY (cid, meta_offset, seq))",
+        "CREATE INDEX IF NOT EXISTS entries_by_seq ON entries (seq)",
+    )
+    COVERED = "EXISTS (SELECT 1 FROM entries h WHERE h.cid = e.cid AND h.meta_offset = e.meta_offset AND h.seq > e.seq)"
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            for statement in self.SCHEMA:
+                self.db.execute(statement)
+        if legacy_path and os.path.exists(legacy_path):
+            self.migrate(legacy_path)
+
+    def migrate(self, legacy_path: str) -> None:
+        """
+        Imports the old plain text ledger, those mods have no entry rows so disabling them falls back to vanilla
+        """
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            names = sorted({line.strip() for line in f if line.strip()})
+        with self.lock, self.db:
+            seq = self.next_seq()
+            for name in names:
+                if self.db.execute("INSERT OR IGNORE INTO mods (name, path, seq) VALUES (?, ?, ?)", (name, project_path("Mods", name), seq)).rowcount:
+                    seq += 1
+        os.remove(legacy_path)
+
+    def next_seq(self) -> int:
+        return self.db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM mods").fetchone()[0]
+
+    def seq_of(self, name: str) -> Optional[int]:
+        row = self.db.execute("SELECT seq FROM mods WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def applied_mods(self) -> List[str]:
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT name FROM mods ORDER BY seq")]
+
+    def applied_paths(self) -> List[Tuple[str, str]]:
+        with self.lock:
+            return self.db.execute("SELECT name, path FROM mods ORDER BY seq").fetchall()
+
+    def is_applied(self, name: str) -> bool:
+        with self.lock:
+            return self.seq_of(name) is not None
+
+    def has_entries(self, name: str) -> bool:
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM entries WHERE seq = (SELECT seq FROM mods WHERE name = ?) LIMIT 1", (name,)).fetchone() is not None
+
+    def mod_cids(self, name: str) -> set:
+        with self.lock:
+            return {row[0] for row in self.db.execute("SELECT DISTINCT cid FROM entries WHERE seq = (SELECT seq FROM mods WHERE name = ?)", (name,))}
+
+    def add_mods(self, records: List[Tuple[str, str, Optional[int], Optional[int], List[Tuple[int, int, Optional[int], Optional[int]]]]],
+                 displaced: Optional[Dict[Tuple[int, int], Tuple[int, int]]] = None) -> None:
+        """
+        Pushes (name, path, size, mtime_ns, [(cid, meta_offset, file_offset, file_size)]) records on top
+        in the given order, displaced carries the TOC values they replaced so the owners they cover keep
+        an exact location, a mod that is already applied moves to the top
+        """
+        with self.lock, self.db:
+            for (cid, meta_offset), (off, size) in (displaced or {}).items():
+                self.db.execute(
+                    "UPDATE entries SET file_offset = ?, file_size = ? WHERE cid = ? AND meta_offset = ? "
+                    "AND seq = (SELECT MAX(seq) FROM entries WHERE cid = ? AND meta_offset = ?)",
+                    (off, size, cid, meta_offset, cid, meta_offset),
+                )
+            for name, path, size, mtime_ns, rows in records:
+                self.delete(name)
+                seq = self.next_seq()
+                self.db.execute("INSERT INTO mods (name, path, seq, size, mtime_ns) VALUES (?, ?, ?, ?, ?)", (name, path, seq, size, mtime_ns))
+                self.db.executemany("INSERT INTO entries (seq, cid, meta_offset, file_offset, file_size) VALUES (?, ?, ?, ?, ?)",
+                                    [(seq, *row) for row in rows])
+
+    def delete(self, name: str) -> None:
+        seq = self.seq_of(name)
+        if seq is not None:
+            self.db.execute("DELETE FROM entries WHERE seq = ?", (seq,))
+            self.db.execute("DELETE FROM mods WHERE seq = ?", (seq,))
+
+    def remove_mod(self, name: str) -> None:
+        with self.lock, self.db:
+            self.delete(name)
+
+    def top_entries(self, name: str) -> List[Tuple[int, int]]:
+        """
+        Entries the mod still owns in the TOC, the ones no later mod covers
+        """
+        with self.lock:
+            return [(cid, meta_offset) for cid, meta_offset in self.db.execute(
+                f"SELECT e.cid, e.meta_offset FROM entries e WHERE e.seq = (SELECT seq FROM mods WHERE name = ?) AND NOT {self.COVERED}", (name,))]
+
+    def top_owners(self, keys: Iterable[Tuple[int, int]], exclude: Optional[str] = None) -> Dict[Tuple[int, int], Optional[LedgerOwner]]:
+        """
+        Newest owner of every (container_id, meta_offset) leaving out exclude, None where only vanilla is left
+        """
+        owners = {}
+        with self.lock:
+            skip = self.seq_of(exclude) if exclude is not None else None
+            for cid, meta_offset in keys:
+                row = self.db.execute(
+                    f"SELECT m.name, m.path, e.file_offset, e.file_size, {self.COVERED} FROM entries e JOIN mods m ON m.seq = e.seq "
+                    "WHERE e.cid = ? AND e.meta_offset = ? AND e.seq IS NOT ? ORDER BY e.seq DESC LIMIT 1",
+                    (cid, meta_offset, skip),
+                ).fetchone()
+                owners[(cid, meta_offset)] = LedgerOwner(*row[:4], bool(row[4])) if row else None
+        return owners
+
+    def stamp_of(self, name: str) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """
+        (size, mtime_ns) the package had when it was applied
+        """
+        with self.lock:
+            return self.db.execute("SELECT size, mtime_ns FROM mods WHERE name = ?", (name,)).fetchone()
+
+    def covered_extents(self, cid: int) -> List[Tuple[int, int]]:
+        """
+        (offset, size) of payloads a newer mod covers, the TOC no longer points at them but a disable can bring them back
+        """
+        with self.lock:
+            return self.db.execute(
+                f"SELECT e.file_offset, e.file_size FROM entries e WHERE e.cid = ? AND e.file_offset IS NOT NULL AND {self.COVERED}", (cid,)).fetchall()
+
+    def clear(self) -> None:
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM entries")
+            self.db.execute("DELETE FROM mods")
+
+
+class ModManagerLogic:
+    def __init__(self, profile: Optional[GameProfile] = None, game_folder: Optional[str] = None, full_backups: bool = False,
+                 backup_progress: Optional[Callable[[int, int, str], None]] = None):
+        self.profile = profile or GAME_PROFILES["ascension"]
+        self.game_folder = game_folder
+        self.ledger_path = project_path(f"applied_mods_{self.profile.key}.db")
+        self.ledger = ModLedger(self.ledger_path, legacy_path=project_path(f"applied_mods_{self.profile.key}.txt"))
+        self.free_space_path = project_path(f"free_space_{self.profile.key}.txt")
+        self.toc_journal_path = project_path(BACKUP_FOLDER, self.profile.key, "toc.wal")
+        # the metadata blocks are captured before anything can touch the TOC, hashing and full copies run behind
+        # once recovery is done with the containers
+        ensure_backups(self.profile, self.game_folder)
+        self.recover_toc_journal()
+        self.recover_compactions()
+        self.backup_thread = threading.Thread(target=complete_backups, args=(self.profile, self.game_folder, backup_progress, full_backups), daemon=True)
+        self.backup_thread.start()
+
+    @property
+    def containers(self) -> Dict[int, str]:
+        return {c.cid: game_path(self.game_folder, c.name) for c in self.profile.containers}
+
+    def get_index(self, cid: int) -> PakIndex:
+        """
+        TOC table of a container, served from the index cache unless the container changed
+        """
+        return load_pak_index(self.profile, self.profile.container_map[cid], self.game_folder)
+
+    def get_applied_mods(self) -> set:
+        return set(self.ledger.applied_mods())
+
+    def get_orphaned_mods(self) -> List[str]:
+        """
+        Applied mods whose package is gone from the Mods folder, they keep owning their entries until disabled
+        """
+        return [name for name, _path in self.ledger.applied_paths() if not os.path.exists(project_path("Mods", name))]
+
+    def update_ledger(self, mod_name: str, add: bool = True) -> None:
+        """
+        Records or drops a mod without any entry provenance, apply and disable go through the TOC journal instead
+        """
+        if add:
+            self.ledger.add_mods([(mod_name, project_path("Mods", mod_name), None, None, [])])
+        else:
+            self.ledger.remove_mod(mod_name)
+
+    def record_applied(self, journal: TocJournal) -> None:
+        """
+        Pushes the journalled mods onto the ledger, an entry belongs to the last of them that patched it
+        and the earlier ones keep a row without a payload since it was never written
+        """
+        new_values = {(p.cid, p.meta_offset): (p.new_off, p.new_size) for p in journal.patches}
+        mod_keys = []
+        last_writer: Dict[Tuple[int, int], int] = {}
+        for position, keys in enumerate(journal.mod_keys):
+            keys = list(dict.fromkeys(key for key in keys if key in new_values))
+            mod_keys.append(keys)
+            for key in keys:
+                last_writer[key] = position
+
+        records = []
+        for position, (mod_path, keys) in enumerate(zip(journal.mod_paths, mod_keys)):
+            try:
+                st = os.stat(mod_path)
+                # the size and mtime tell a changed package apart, hashing it would read every package a second time
+                stamp = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                stamp = (None, None)
+            rows = [key + (new_values[key] if last_writer[key] == position else (None, None)) for key in keys]
+            records.append((os.path.basename(mod_path), os.path.abspath(mod_path)) + stamp + (rows,))
+        self.ledger.add_mods(records, {(p.cid, p.meta_offset): (p.old_off, p.old_size) for p in journal.patches})
+
+    def live_extents(self, container: ContainerProfile, index: PakIndex) -> List[Tuple[int, int]]:
+        """
+        Merged (start, end) ranges past vanilla_size that TOC entries or covered ledger owners still point at
+        """
+        extents: List[List[int]] = []
+        live = [(index.offsets[i], index.sizes[i]) for i in range(len(index)) if index.offsets[i] >= container.vanilla_size]
+        live += [(off, size) for off, size in self.ledger.covered_extents(container.cid) if off >= container.vanilla_size]
+        for off, size in sorted(live):
+            if extents and off <= extents[-1][1]:
+                extents[-1][1] = max(extents[-1][1], off + size)
+            else:
+                extents.append([off, off + size])
+        return [(start, end) for start, end in extents]
+
+    def compute_free_extents(self, cid: int) -> List[Tuple[int, int]]:
+        container = self.profile.container_map[cid]
+        container_size = os.path.getsize(game_path(self.game_folder, container.name))
+        free = []
+        cursor = container.vanilla_size
+        for start, end in self.live_extents(container, self.get_index(cid)):
+            if start > cursor:
+                free.append((cursor, start - cursor))
+            cursor = max(cursor, end)
+        if container_size > cursor:
+            free.append((cursor, container_size - cursor))
+        return free
+
+    def load_free_space(self) -> Dict[int, Tuple[int, int, List[Tuple[int, int]]]]:
+        """
+        container_id -> (container size, mtime_ns, [(offset, length)]) as saved after the last apply/disable
+        """
+        free_space = {}
+        if not os.path.exists(self.free_space_path):
+            return free_space
+        try:
+            with open(self.free_space_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 3:
+                        continue
+                    extents = [tuple(int(v) for v in field.split(":")) for field in fields[3:]]
+                    free_space[int(fields[0])] = (int(fields[1]), int(fields[2]), extents)
+        except (OSError, ValueError):
+            return {}
+        return free_space
+
+    def save_free_space(self, free_space: Dict[int, Tuple[int, int, List[Tuple[int, int]]]]) -> None:
+        tmp_path = self.free_space_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for cid in sorted(free_space):
+                size, mtime_ns, extents = free_space[cid]
+                f.write(" ".join([str(cid), str(size), str(mtime_ns)] + [f"{off}:{length}" for off, length in extents]) + "\n")
+        os.replace(tmp_path, self.free_space_path)
+
+    def get_free_extents(self, cid: int) -> FreeExtents:
+        """
+        The saved free list when the container hasn't changed since it was written, otherwise rebuilt from the TOC
+        """
+        container = self.profile.container_map[cid]
+        if container.vanilla_size is None:
+            return FreeExtents()
+        st = os.stat(game_path(self.game_folder, container.name))
+        saved = self.load_free_space().get(cid)
+        if saved and saved[0] == st.st_size and saved[1] == st.st_mtime_ns and st.st_mtime_ns < os.stat(self.free_space_path).st_mtime_ns:
+            return FreeExtents(saved[2])
+        return FreeExtents(self.compute_free_extents(cid))
+
+    def refresh_free_space(self, cids: Iterable[int]) -> None:
+        """
+        Rebuilds the free list of the given containers after their TOC changed,
+        a hole that reaches the end of the container is truncated away instead of being kept
+        """
+        free_space = self.load_free_space()
+        for cid in cids:
+            container = self.profile.container_map[cid]
+            target_pak = game_path(self.game_folder, container.name)
+            if container.vanilla_size is None or not os.path.exists(target_pak):
+                continue
+            extents = self.compute_free_extents(cid)
+            if extents and sum(extents[-1]) == os.path.getsize(target_pak):
+                os.truncate(target_pak, extents.pop()[0])
+            st = os.stat(target_pak)
+            free_space[cid] = (st.st_size, st.st_mtime_ns, extents)
+        try:
+            self.save_free_space(free_space)
+        except OSError:
+            pass
+
+    def get_mod_header(self, mod_path: str, with_images: bool = True):
+        with open(mod_path, "rb") as f:
+            sig_len_raw = f.read(1)
+            if not sig_len_raw:
+                return None
+            sig_len = int.from_bytes(sig_len_raw, "little")
+            signature = f.read(sig_len)
+            if signature not in (MOD_SIGNATURE, MOD_SIGNATURE_V2):
+                return None
+
+            file_count = int.from_bytes(f.read(4), "little")
+            mod_format = 2 if signature == MOD_SIGNATURE_V2 else 1
+            directory_offset = int.from_bytes(f.read(8), "little") if mod_format == 2 else self.find_directory_trailer(f)
+
+            def read_prefixed_string(size_bytes):
+                length = int.from_bytes(f.read(size_bytes), "little")
+                return f.read(length).decode("utf-8", errors="ignore")
+
+            meta = {
+                "author": read_prefixed_string(1),
+                "version": read_prefixed_string(1),
+                "description": read_prefixed_string(2),
+            }
+
+            img_count = int.from_bytes(f.read(1), "little")
+            images = []
+            for _ in range(img_count):
+                img_size = int.from_bytes(f.read(4), "little")
+                if with_images:
+                    images.append(f.read(img_size))
+                else:
+                    f.seek(img_size, 1)
+
+            return {
+                "meta": meta,
+                "images": images,
+                "file_count": file_count,
+                "format": mod_format,
+                "directory_offset": directory_offset,
+            }
+
+    def find_directory_trailer(self, f) -> Optional[int]:
+        """
+        Directory offset of a v1 package written with a trailer, None for packages that predate it
+        """
+        here = f.tell()
+        end = f.seek(0, 2)
+        offset = None
+        if end >= here + MOD_DIRECTORY_TRAILER.size:
+            f.seek(end - MOD_DIRECTORY_TRAILER.size)
+            directory_offset, magic = MOD_DIRECTORY_TRAILER.unpack(f.read(MOD_DIRECTORY_TRAILER.size))
+            if magic == MOD_DIRECTORY_MAGIC and here <= directory_offset < end - MOD_DIRECTORY_TRAILER.size:
+                f.seek(directory_offset)
+                if f.read(4) == MOD_DIRECTORY_MAGIC:
+                    offset = directory_offset
+        f.seek(here)
+        return offset
+
+    def calculate_payload_offset(self, f) -> int:
+        f.seek(0)
+        sig_len = int.from_bytes(f.read(1), "little")
+        signature = f.read(sig_len)
+        f.seek(4, 1)  # file count
+        if signature == MOD_SIGNATURE_V2:
+            f.seek(8, 1)  # directory offset
+        for _ in range(2):
+            f.seek(int.from_bytes(f.read(1), "little"), 1)
+        f.seek(int.from_bytes(f.read(2), "little"), 1)
+        img_count = int.from_bytes(f.read(1), "little")
+        for _ in range(img_count):
+            f.seek(int.from_bytes(f.read(4), "little"), 1)
+        return f.tell()
+
+    def read_mod_directory(self, mod_f, header) -> List[ModEntry]:
+        """
+        Reads the entry directory at the end of a v2 or trailered v1 package, no payload bytes are touched
+        """
+        mod_f.seek(header["directory_offset"])
+        data = mod_f.read()
+        if data[:4] != MOD_DIRECTORY_MAGIC or int.from_bytes(data[4:8], "little") != header["file_count"]:
+            raise ValueError("Mod directory is missing or damaged.")
+
+        entries = []
+        pos = 8
+        for _ in range(header["file_count"]):
+            if pos + MOD_DIRECTORY_ENTRY.size > len(data):
+                raise ValueError("Mod directory is truncated.")
+            cont_id, meta_offset, orig_off, orig_size, data_offset, stored_size, payload_size, checksum, tail_size, codec, name_len = MOD_DIRECTORY_ENTRY.unpack_from(data, pos)
+            pos += MOD_DIRECTORY_ENTRY.size
+            name = data[pos:pos + name_len].decode("utf-8", errors="ignore")
+            pos += name_len
+            if not tail_size:
+                raise ValueError(f"{name or 'Mod entry'} does not contain valid Ingelmia taildata.")
+            entries.append(ModEntry(data_offset, payload_size, cont_id, meta_offset, orig_off, orig_size, tail_size, name, checksum, codec, stored_size))
+        return entries
+
+    def iter_mod_entries(self, mod_f, header) -> Iterator[ModEntry]:
+        """
+        Yields a mod's entries without reading payloads, packages with a directory are read straight from it,
+        older v1 packages are walked through their size prefixes reading only each entry's taildata
+        """
+        if header.get("directory_offset") is not None:
+            yield from self.read_mod_directory(mod_f, header)
+            return
+
+        pos = self.calculate_payload_offset(mod_f)
+        for _ in range(header["file_count"]):
+            mod_f.seek(pos)
+            size_raw = mod_f.read(4)
+            if len(size_raw) < 4:
+                raise ValueError("Mod package is truncated.")
+            file_size = int.from_bytes(size_raw, "little")
+            data_offset = pos + 4
+
+            tail_read = min(TAILDATA_V2_SIZE, file_size)
+            mod_f.seek(data_offset + file_size - tail_read)
+            cont_id, meta_offset, orig_off, orig_size, tail_size = unpack_taildata(mod_f.read(tail_read))
+
+            yield ModEntry(data_offset, file_size - tail_size, cont_id, meta_offset, orig_off, orig_size, tail_size)
+            pos = data_offset + file_size
+
+    def list_mod_entries(self, mod_path: str) -> List[ModEntry]:
+        header = self.get_mod_header(mod_path, with_images=False)
+        if not header:
+            raise ValueError(f"{os.path.basename(mod_path)} is not a valid mod package.")
+        with open(mod_path, "rb") as mod_f:
+            return list(self.iter_mod_entries(mod_f, header))
+
+    def validate_mod(self, mod_path: str, check_payloads: bool = True) -> Tuple[bool, List[str]]:
+        """
+        Checks that every entry lies inside the package and, for packages with a directory, that payload crc32s still match
+        """
+        try:
+            entries = self.list_mod_entries(mod_path)
+        except (OSError, ValueError) as e:
+            return False, [str(e)]
+
+        problems: List[str] = []
+        mod_size = os.path.getsize(mod_path)
+        with open(mod_path, "rb") as mod_f:
+            for i, entry in enumerate(entries):
+                label = entry.name or f"entry {i}"
+                if entry.data_offset + entry.packed_size + entry.tail_size > mod_size:
+                    problems.append(f"{label}: data runs past the end of the package")
+                    continue
+                if check_payloads and entry.checksum is not None:
+                    crc = 0
+                    size = 0
+                    try:
+                        for chunk in iter_mod_payload(mod_f, entry):
+                            crc = zlib.crc32(chunk, crc)
+                            size += len(chunk)
+                    except Exception as e:
+                        problems.append(f"{label}: {e}")
+                        continue
+                    if crc != entry.checksum or size != entry.payload_size:
+                        problems.append(f"{label}: checksum mismatch")
+        return not problems, problems
+
+    def diff_mods(self, mod_a: str, mod_b: str) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        Compares two mods by the TOC entries they patch, payloads are compared by crc32 when both have a directory
+        """
+        entries_a = {e.key: e for e in self.list_mod_entries(mod_a)}
+        entries_b = {e.key: e for e in self.list_mod_entries(mod_b)}
+        shared = entries_a.keys() & entries_b.keys()
+        changed = [
+            k for k in shared
+            if entries_a[k].payload_size != entries_b[k].payload_size
+            or entries_a[k].checksum is None
+            or entries_a[k].checksum != entries_b[k].checksum
+        ]
+        return {
+            "only_a": sorted(entries_a.keys() - entries_b.keys()),
+            "only_b": sorted(entries_b.keys() - entries_a.keys()),
+            "changed": sorted(changed),
+            "same": sorted(shared - set(changed)),
+        }
+
+    def patch_toc(self, pak, patches: Dict[int, Tuple[int, int]]) -> None:
+        """
+        Writes (file_offset, file_size) for each meta_offset in one pass sorted by position
+        """
+        name_size = self.profile.entry_name_size
+        for meta_offset in sorted(patches):
+            pak.seek(meta_offset + name_size)
+            pak.write(struct.pack("<II", *patches[meta_offset]))
+
+    def commit_toc(self, handles: Dict[int, io.RawIOBase], patches: Dict[int, Dict[int, Tuple[int, int]]],
+                   mod_paths: Iterable[str] = (), ledger_op: int = TOC_LEDGER_NONE,
+                   mod_keys: Optional[List[List[Tuple[int, int]]]] = None) -> None:
+        """
+        Patches the TOC of every container as one transaction through the write ahead journal,
+        the containers are fsynced once before the journal is written and once after all patches land,
+        mod_keys are the entry keys of each of mod_paths the ledger update records
+        """
+        name_size = self.profile.entry_name_size
+        records = []
+        for cont_id, container_patches in patches.items():
+            pak = handles[cont_id]
+            for meta_offset in sorted(container_patches):
+                pak.seek(meta_offset + name_size)
+                old_off, old_size = struct.unpack("<II", pak.read(8))
+                records.append(TocPatch(cont_id, meta_offset, old_off, old_size, *container_patches[meta_offset]))
+            # payloads have to be durable before a journal can point the TOC at them
+            os.fsync(pak.fileno())
+
+        journal = TocJournal(self.toc_journal_path, records, mod_paths, ledger_op, mod_keys=mod_keys)
+        journal.save()
+        try:
+            for cont_id, container_patches in patches.items():
+                self.patch_toc(handles[cont_id], container_patches)
+            for cont_id in patches:
+                os.fsync(handles[cont_id].fileno())
+        except BaseException:
+            # if putting the old values back fails as well the journal stays for the next startup
+            self.roll_back_toc(journal, handles)
+            raise
+        journal.mark_applied()
+        self.finish_ledger(journal)
+        journal.clear()
+
+    def roll_back_toc(self, journal: TocJournal, handles: Dict[int, io.RawIOBase]) -> None:
+        for cont_id, old_values in journal.by_container(new=False).items():
+            self.patch_toc(handles[cont_id], old_values)
+            os.fsync(handles[cont_id].fileno())
+        journal.clear()
+
+    def finish_ledger(self, journal: TocJournal) -> None:
+        if journal.ledger_op == TOC_LEDGER_ADD:
+            self.record_applied(journal)
+        elif journal.ledger_op == TOC_LEDGER_REMOVE:
+            for mod_path in journal.mod_paths:
+                self.ledger.remove_mod(os.path.basename(mod_path))
+
+    def recover_toc_journal(self) -> None:
+        """
+        Rolls back a batch of TOC patches that was cut short, or finishes the ledger update of one that fully landed,
+        only the journalled entries are read or written
+        """
+        if not os.path.exists(self.toc_journal_path):
+            return
+        journal = TocJournal.load(self.toc_journal_path)
+        if journal is None:
+            # torn while being written, nothing is patched before the journal is synced
+            os.remove(self.toc_journal_path)
+            return
+        if journal.state == TOC_JOURNAL_APPLIED:
+            self.finish_ledger(journal)
+            journal.clear()
+            return
+
+        containers = self.containers
+        cont_ids = {p.cid for p in journal.patches}
+        handles = {}
+        try:
+            for cont_id in cont_ids:
+                handles[cont_id] = open(containers[cont_id], "r+b", buffering=0)
+            self.roll_back_toc(journal, handles)
+        except Exception as e:
+            messagebox.showerror("Mod Recovery", f"Failed to roll back an interrupted mod operation: {e}")
+            return
+        finally:
+            for pak in handles.values():
+                pak.close()
+        self.refresh_free_space(cont_ids)
+
+    def write_mod_entries(self, sources: List[Tuple[str, ModEntry]], mod_paths: Iterable[str] = (), ledger_op: int = TOC_LEDGER_ADD,
+                          patches: Optional[Dict[int, Dict[int, Tuple[int, int]]]] = None,
+                          mod_keys: Optional[List[List[Tuple[int, int]]]] = None) -> Dict[int, Dict[int, Tuple[int, int]]]:
+        """
+        Streams (mod_path, entry) payloads into their containers in the given order with one handle per container
+        and per package, then patches every TOC in one journalled pass together with the ledger update for mod_paths,
+        returns the patches per container, patches seeds it with entries pointing at data already in place
+
+        mod_keys lists the entry keys each of mod_paths carries, by default the keys of its entries in sources
+
+        Nothing is patched until every payload is written, if a write fails the appended bytes are truncated away
+        """
+        containers = self.containers
+        patches = {cont_id: dict(container_patches) for cont_id, container_patches in (patches or {}).items()}
+        for cont_id in {entry.container_id for _path, entry in sources} | set(patches):
+            target_pak = containers.get(cont_id)
+            if not target_pak or not os.path.exists(target_pak):
+                raise FileNotFoundError(f"Missing container for id {cont_id}: {target_pak}")
+
+        handles = {}
+        mod_files = {}
+        start_sizes: Dict[int, int] = {}
+        end_offsets: Dict[int, int] = {}
+        free: Dict[int, FreeExtents] = {}
+        mod_paths = list(mod_paths)
+        if mod_keys is None:
+            keys_by_path: Dict[str, List[Tuple[int, int]]] = {}
+            for mod_path, entry in sources:
+                keys_by_path.setdefault(mod_path, []).append(entry.key)
+            mod_keys = [keys_by_path.get(mod_path, []) for mod_path in mod_paths]
+
+        def open_container(cont_id: int):
+            # one unbuffered handle per container, payloads are streamed straight into it
+            pak = handles[cont_id] = open(containers[cont_id], "r+b", buffering=0)
+            start_sizes[cont_id] = end_offsets[cont_id] = pak.seek(0, 2)
+            free[cont_id] = self.get_free_extents(cont_id)
+            return pak
+
+        try:
+            for cont_id in patches:
+                open_container(cont_id)
+            for mod_path, entry in sources:
+                cont_id = entry.container_id
+                pak = handles.get(cont_id) or open_container(cont_id)
+                mod_f = mod_files.get(mod_path)
+                if mod_f is None:
+                    mod_f = mod_files[mod_path] = open(mod_path, "rb")
+
+                # holes left by disabled mods are filled best fit before anything is appended
+                new_offset = free[cont_id].take(entry.payload_size)
+                if new_offset is None:
+                    new_offset = end_offsets[cont_id]
+                    end_offsets[cont_id] = new_offset + entry.payload_size
+                pak.seek(new_offset)
+                write_mod_payload(mod_f, entry, pak)
+                patches.setdefault(cont_id, {})[entry.meta_offset] = (new_offset, entry.payload_size)
+
+            self.commit_toc(handles, patches, mod_paths, ledger_op if mod_paths else TOC_LEDGER_NONE, mod_keys)
+        except Exception:
+            # a journal left behind means the TOC may still point at the new payloads, otherwise drop them
+            for cont_id, pak in handles.items() if not os.path.exists(self.toc_journal_path) else ():
+                try:
+                    pak.truncate(start_sizes[cont_id])
+                except OSError:
+                    pass
+            raise
+        finally:
+            for f in list(handles.values()) + list(mod_files.values()):
+                f.close()
+
+        self.refresh_free_space(handles)
+        return patches
+
+    def apply_mod(self, mod_path: str, selection: Optional[Iterable[Tuple[int, int]]] = None):
+        """
+        Appends a mod's payloads and points the TOC at them,
+        selection limits it to those (container_id, meta_offset) entries
+        """
+        if not os.path.exists(mod_path):
+            return False, "Mod package missing"
+        try:
+            header = self.get_mod_header(mod_path, with_images=False)
+            if not header:
+                return False, "Invalid Mod"
+            selection = set(selection) if selection is not None else None
+            with open(mod_path, "rb") as mod_f:
+                entries = [e for e in self.iter_mod_entries(mod_f, header) if selection is None or e.key in selection]
+            self.write_mod_entries([(mod_path, entry) for entry in entries], [mod_path])
+        except Exception as e:
+            return False, str(e)
+        return True, "Mod Applied"
+
+    def resolve_load_order(self, mod_paths: Iterable[str]) -> Tuple[List[Tuple[str, ModEntry]], int, List[List[Tuple[int, int]]]]:
+        """
+        Keeps only the last writer of every (container_id, meta_offset) across mods given in load order,
+        returns the surviving (mod_path, entry) pairs in load order, how many entries were overridden
+        and the keys of every mod, overridden ones included
+        """
+        winners: Dict[Tuple[int, int], Tuple[int, str, ModEntry]] = {}
+        mod_keys = []
+        total = 0
+        for position, mod_path in enumerate(mod_paths):
+            keys = []
+            for entry in self.list_mod_entries(mod_path):
+                winners[entry.key] = (position, mod_path, entry)
+                keys.append(entry.key)
+                total += 1
+            mod_keys.append(keys)
+        survivors = sorted(winners.values(), key=lambda w: (w[0], w[2].data_offset))
+        return [(mod_path, entry) for _position, mod_path, entry in survivors], total - len(survivors), mod_keys
+
+    def apply_mods(self, mod_paths: Iterable[str]):
+        """
+        Applies mods in load order as if one after another, but payloads a later mod overrides are never
+        written, the survivors go out in one pass per container with a single TOC patch each
+        """
+        mod_paths = list(mod_paths)
+        try:
+            sources, overridden, mod_keys = self.resolve_load_order(mod_paths)
+            self.write_mod_entries(sources, mod_paths, mod_keys=mod_keys)
+        except Exception as e:
+            return False, str(e)
+        return True, f"Applied {len(mod_paths)} mods, {len(sources)} entries written, {overridden} overridden entries skipped"
+
+    def vanilla_toc_values(self, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """
+        Shipped (file_offset, file_size) of TOC entries read straight out of the backed up metadata blocks
+        """
+        name_size = self.profile.entry_name_size
+        blocks: Dict[int, Optional[bytes]] = {}
+        values = {}
+        for cid, meta_offset in keys:
+            if cid not in blocks:
+                container = self.profile.container_map.get(cid)
+                blocks[cid] = load_backup_metadata(self.profile, container) if container else None
+            block = blocks[cid]
+            if block is None:
+                raise FileNotFoundError(f"Backup not found for container {cid}. Cannot restore original metadata.")
+            if meta_offset + name_size + 8 > len(block):
+                raise ValueError(f"Entry at {meta_offset} lies outside the backed up metadata of container {cid}.")
+            values[(cid, meta_offset)] = struct.unpack_from("<II", block, meta_offset + name_size)
+        return values
+
+    def plan_restore(self, keys: Iterable[Tuple[int, int]], exclude: Optional[str] = None) -> Tuple[Dict[int, Dict[int, Tuple[int, int]]], List[Tuple[str, ModEntry]]]:
+        """
+        What each (container_id, meta_offset) goes back to: the newest ledger owner other than exclude,
+        or the backed up vanilla value when none is left, entries whose TOC already holds that value are skipped,
+        returns the TOC patches and the owner payloads that still have to be written
+
+        An owner nothing covers is what the TOC points at, compaction moves its payload without touching
+        the ledger so the TOC is kept as is for those entries
+        """
+        planned: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        vanilla_keys = []
+        rewrite: Dict[str, List[Tuple[int, int]]] = {}
+        for key, owner in self.ledger.top_owners(keys, exclude).items():
+            if owner is None:
+                vanilla_keys.append(key)
+            elif not owner.covered:
+                continue
+            elif owner.file_offset is not None:
+                planned[key] = (owner.file_offset, owner.file_size)
+            else:
+                # the owner was overridden in the same batch it was applied in, its payload was never written
+                rewrite.setdefault(owner.path, []).append(key)
+        planned.update(self.vanilla_toc_values(vanilla_keys))
+
+        current = self.current_toc_values(planned)
+        patches: Dict[int, Dict[int, Tuple[int, int]]] = {}
+        for (cid, meta_offset), value in planned.items():
+            if current.get((cid, meta_offset)) != value:
+                patches.setdefault(cid, {})[meta_offset] = value
+
+        sources: List[Tuple[str, ModEntry]] = []
+        for owner_path, owner_keys in rewrite.items():
+            stamp = self.ledger.stamp_of(os.path.basename(owner_path))
+            st = os.stat(owner_path)
+            if stamp and stamp[0] is not None and stamp != (st.st_size, st.st_mtime_ns):
+                raise ValueError(f"{os.path.basename(owner_path)} changed since it was applied, use Disable All to restore the containers.")
+            owner_entries = {e.key: e for e in self.list_mod_entries(owner_path)}
+            missing = [key for key in owner_keys if key not in owner_entries]
+            if missing:
+                raise ValueError(f"{os.path.basename(owner_path)} changed since it was applied, use Disable All to restore the containers.")
+            sources.extend((owner_path, owner_entries[key]) for key in owner_keys)
+        return patches, sources
+
+    def current_toc_values(self, keys: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Tuple[int, int]]:
+        """
+        (file_offset, file_size) the TOC holds right now for each (container_id, meta_offset) found in it
+        """
+        wanted: Dict[int, set] = {}
+        for cid, meta_offset in keys:
+            wanted.setdefault(cid, set()).add(meta_offset)
+        values = {}
+        for cid, meta_offsets in wanted.items():
+            index = self.get_index(cid)
+            for i, meta_offset in enumerate(index.meta_offsets):
+                if meta_offset in meta_offsets:
+                    values[(cid, meta_offset)] = (index.offsets[i], index.sizes[i])
+        return values
+
+    def restore_entries(self, entries: Iterable[Tuple[int, int]], exclude: Optional[str] = None):
+        """
+        Puts the given (container_id, meta_offset) entries back to what the ledger says they should hold,
+        leaving out the mod named exclude, only entries whose TOC disagrees are patched in one sorted pass per container
+        """
+        try:
+            patches, sources = self.plan_restore(entries, exclude)
+            restored = sum(len(p) for p in patches.values()) + len(sources)
+            if restored:
+                self.write_mod_entries(sources, patches=patches)
+        except Exception as e:
+            return False, str(e)
+        return True, f"Restored {restored} entries"
+
+    def disable_mod(self, mod_path: str):
+        """
+        Restores only the entries the mod still owns, each goes back to the newest mod applied before it
+        or to vanilla, entries a later mod covers are left alone and only the mod's rows leave the ledger
+
+        The ledger rows are enough for a tracked mod, its package only has to exist for mods applied before
+        the ledger recorded entries
+        """
+        mod_name = os.path.basename(mod_path)
+        try:
+            if self.ledger.has_entries(mod_name):
+                keys = self.ledger.top_entries(mod_name)
+            else:
+                header = self.get_mod_header(mod_path, with_images=False) if os.path.exists(mod_path) else None
+                if not header:
+                    return False, "Invalid Mod"
+                # applied before the ledger tracked entries, every entry of the package is restored
+                with open(mod_path, "rb") as mod_f:
+                    keys = list(dict.fromkeys(e.key for e in self.iter_mod_entries(mod_f, header)))
+            touched = self.ledger.mod_cids(mod_name)
+            patches, sources = self.plan_restore(keys, exclude=mod_name)
+            self.write_mod_entries(sources, [mod_path], TOC_LEDGER_REMOVE, patches)
+        except Exception as e:
+            return False, str(e)
+
+        # payloads of the mod that were covered are not in the TOC, their containers still need a new free list
+        self.refresh_free_space(touched - set(patches) - {entry.container_id for _path, entry in sources})
+        return True, "Mod Disabled"
+
+    def conflict_index(self) -> "ModConflictIndex":
+        return ModConflictIndex(self).refresh()
+
+    def verify_containers(self, progress_callback: Optional[Callable[[int, int, str], None]] = None, workers: int = DEFAULT_VERIFY_WORKERS) -> List[VerifyResult]:
+        return [verify_container(self.profile, c, self.game_folder, workers, progress_callback) for c in self.profile.containers]
+
+    def compaction_journal_path(self, container: ContainerProfile) -> str:
+        return project_path(BACKUP_FOLDER, self.profile.key, f"{container.name}.compact")
+
+    def plan_compaction(self, container: ContainerProfile, index: PakIndex) -> Tuple[List[CompactionMove], int]:
+        """
+        Merges every payload the TOC still points at past vanilla_size into extents and slides them
+        down one after another, returns the moves and the size the container ends up with
+
+        Payloads of covered ledger owners have no TOC entry to patch, the extents holding them stay where they are
+        """
+        live = [(index.offsets[i], index.sizes[i], index.meta_offsets[i]) for i in range(len(index)) if index.offsets[i] >= container.vanilla_size]
+        live += [(off, size, None) for off, size in self.ledger.covered_extents(container.cid) if off >= container.vanilla_size]
+        extents = []
+        for off, size, meta in sorted(live, key=lambda m: m[:2]):
+            if extents and off <= extents[-1][1]:
+                extents[-1][1] = max(extents[-1][1], off + size)
+                extents[-1][2].append((meta, off, size))
+            else:
+                extents.append([off, off + size, [(meta, off, size)]])
+
+        moves = []
+        cursor = container.vanilla_size
+        for start, end, members in extents:
+            delta = start - cursor
+            length = end - start
+            pinned = any(meta is None for meta, _off, _size in members)
+            if delta == 0 or pinned or (delta < length and delta < COMPACT_MIN_GAP):
+                cursor = end
+                continue
+            moves.append(CompactionMove(start, cursor, length, tuple((meta, off - delta, size) for meta, off, size in members)))
+            cursor += length
+        return moves, cursor
+
+    def run_compaction(self, pak, journal: CompactionJournal, progress_callback: Optional[Callable[[int, int, str], None]] = None, label: str = "") -> None:
+        """
+        Carries out a journal from wherever it stopped, each extent's TOC entries are patched
+        right after it is copied so the container is consistent between moves
+        """
+        fd = pak.fileno()
+        name_size = self.profile.entry_name_size
+        total = sum(move.length for move in journal.moves)
+        moved = sum(move.length for move in journal.moves[:journal.next_move]) + journal.done
+
+        for i in range(journal.next_move, len(journal.moves)):
+            move = journal.moves[i]
+            done = journal.done if i == journal.next_move else 0
+            overlapping = move.src - move.dst < move.length
+            chunk = min(COMPACT_CHUNK, move.src - move.dst) if overlapping else COMPACT_CHUNK
+            while done < move.length:
+                step = min(chunk, move.length - done)
+                os.lseek(fd, move.dst + done, os.SEEK_SET)
+                if copy_file_span(fd, move.src + done, step, fd) != step:
+                    raise OSError(f"Short copy while compacting {label}")
+                done += step
+                moved += step
+                if overlapping:
+                    os.fsync(fd)
+                    journal.advance(i, done)
+                if progress_callback:
+                    progress_callback(moved, total, label)
+
+            os.fsync(fd)
+            for meta_offset, new_offset, size in sorted(move.patches):
+                os.lseek(fd, meta_offset + name_size, os.SEEK_SET)
+                os.write(fd, struct.pack("<II", new_offset, size))
+            os.fsync(fd)
+            journal.advance(i + 1, 0)
+
+        pak.truncate(journal.final_size)
+        os.fsync(fd)
+        journal.clear()
+
+    def compact_container(self, cid: int, progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """
+        Reclaims appended bytes no TOC entry points at any more by packing the live modded payloads
+        directly after vanilla_size, then truncates the container
+        """
+        container = self.profile.container_map[cid]
+        target_pak = game_path(self.game_folder, container.name)
+        if not os.path.exists(target_pak):
+            return False, f"Missing container for id {cid}: {target_pak}"
+        if container.vanilla_size is None:
+            return False, f"{self.profile.display_name} profile needs vanilla_size for {container.name} before it can be compacted."
+
+        try:
+            size_before = os.path.getsize(target_pak)
+            moves, final_size = self.plan_compaction(container, self.get_index(cid))
+            if not moves and final_size >= size_before:
+                return True, f"{container.name}: nothing to reclaim"
+            journal = CompactionJournal(self.compaction_journal_path(container), moves, final_size)
+            journal.save()
+            with open(target_pak, "r+b", buffering=0) as pak:
+                self.run_compaction(pak, journal, progress_callback, container.name)
+            self.refresh_free_space([cid])
+        except Exception as e:
+            return False, str(e)
+        return True, f"{container.name}: reclaimed {size_before - final_size} bytes"
+
+    def compact_all(self, progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        messages = []
+        for container in self.profile.containers:
+            if not os.path.exists(game_path(self.game_folder, container.name)):
+                continue
+            success, msg = self.compact_container(container.cid, progress_callback)
+            if not success:
+                return False, msg
+            messages.append(msg)
+        return True, "\n".join(messages) or "Nothing to compact"
+
+    def recover_compactions(self) -> None:
+        """
+        Rolls forward any compaction that was interrupted, its journal still being there means it never finished
+        """
+        for container in self.profile.containers:
+            journal_path = self.compaction_journal_path(container)
+            target_pak = game_path(self.game_folder, container.name)
+            if not os.path.exists(journal_path) or not os.path.exists(target_pak):
+                continue
+            journal = CompactionJournal.load(journal_path)
+            if journal is None:
+                messagebox.showerror("Compaction Recovery", f"The compaction journal for {container.name} is unreadable, use Disable All to restore the container.")
+                continue
+            try:
+                with open(target_pak, "r+b", buffering=0) as pak:
+                    self.run_compaction(pak, journal, label=container.name)
+                self.refresh_free_space([container.cid])
+            except Exception as e:
+                messagebox.showerror("Compaction Recovery", f"Failed to finish compacting {container.name}: {e}")
+
+    def disable_all(self):
+        for container in self.profile.containers:
+            original_meta = load_backup_metadata(self.profile, container)
+
+            if original_meta is None:
+                messagebox.showerror("Error", f"Backup not found for {container.name}. Cannot restore original metadata.")
+                continue
+
+            target_container = game_path(self.game_folder, container.name)
+
+            if not os.path.exists(target_container):
+                continue
+
+            if container.metadata_size is None or container.vanilla_size is None:
+                messagebox.showwarning(
+                    "Profile Incomplete",
+                    f"{self.profile.display_name} profile needs metadata_size and vanilla_size for {container.name} before Disable All can truncate safely.",
+                )
+                continue
+
+            try:
+                with open(target_container, "r+b") as f:
+                    f.seek(0)
+                    f.write(original_meta)
+                    f.truncate(container.vanilla_size)
+                # a leftover compaction journal would otherwise replay onto the restored container
+                CompactionJournal(self.compaction_journal_path(container), [], container.vanilla_size).clear()
+            except Exception as e:
+                messagebox.showerror("Hard Reset Failed", f"Failed to restore {container.name}: {e}")
+                return False, str(e)
+
+        self.ledger.clear()
+        if os.path.exists(self.free_space_path):
+            os.remove(self.free_space_path)
+        # every TOC is vanilla again, an old journal must not roll anything back onto it
+        TocJournal(self.toc_journal_path, []).clear()
+
+        return True, "All mods cleared. Metadata and file sizes restored where profile sizes were available."
+
+
+def taildata_index_cache_path(source_folder: str) -> str:
+    return project_path(BACKUP_FOLDER, f"taildata_{zlib.crc32(os.path.abspath(source_folder).encode('utf-8')):08x}.idx")
+
+
+class TaildataIndex:
+    """
+    Lowercased basename -> raw taildata for batch updates, built once from a source folder or straight from the container TOCs
+
+    Names shared by several sources land in duplicates and are never used, sources without readable taildata
+    keep their error in invalid so batch reports read the same as one by one transfers
+    """
+
+    def __init__(self):
+        self.tails: Dict[str, bytes] = {}
+        self.duplicates: Dict[str, List[str]] = {}
+        self.invalid: Dict[str, str] = {}
+        self.paths: Dict[str, Optional[bytes]] = {}  # normalized entry path -> taildata, None where containers share the path
+
+    def __len__(self) -> int:
+        return len(self.tails)
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, str, Optional[bytes], Optional[str]]]) -> "TaildataIndex":
+        """
+        items are (key, source, taildata, error) with exactly one of taildata and error set
+        """
+        index = cls()
+        sources: Dict[str, str] = {}
+        for key, source, tail, error in items:
+            if key in sources:
+                index.duplicates.setdefault(key, [sources[key]]).append(source)
+                continue
+            sources[key] = source
+            if error is None:
+                index.tails[key] = tail
+            else:
+                index.invalid[key] = error
+
+        for key in index.duplicates:
+            index.tails.pop(key, None)
+            index.invalid.pop(key, None)
+        return index
+
+    @classmethod
+    def from_folder(cls, folder: str, workers: int = DEFAULT_PACK_WORKERS, cache_path: Optional[str] = None,
+                    progress_callback: Optional[Callable[[int, int, str], None]] = None) -> "TaildataIndex":
+        """
+        Reads the tail of every file under folder on a thread pool, with cache_path set the tails are
+        kept between runs and only files whose size or mtime changed are opened again
+        """
+        cached = cls.load_cache(cache_path) if cache_path else {}
+        files = []
+        for root, _dirs, names in os.walk(folder):
+            for filename in names:
+                files.append((filename, os.path.join(root, filename)))
+
+        def read_tail(item):
+            _filename, path = item
+            try:
+                st = os.stat(path)
+                hit = cached.get(path)
+                if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+                    return hit, None
+                return (st.st_size, st.st_mtime_ns, read_source_taildata(path)), None
+            except Exception as e:
+                return None, str(e)
+
+        items = []
+        records: Dict[str, Tuple[int, int, bytes]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for done, ((filename, path), (record, error)) in enumerate(zip(files, pool.map(read_tail, files)), 1):
+                if record is not None:
+                    records[path] = record
+                items.append((filename.lower(), path, record[2] if record else None, error))
+                if progress_callback and (done % TAILDATA_PROGRESS_STEP == 0 or done == len(files)):
+                    progress_callback(done, len(files), filename)
+
+        if cache_path and records != cached:
+            try:
+                cls.save_cache(cache_path, records)
+            except OSError:
+                pass
+        return cls.build(items)
+
+    @classmethod
+    def from_toc(cls, profile: GameProfile, game_folder: Optional[str] = None) -> "TaildataIndex":
+        """
+        Synthesizes IGT2 taildata for every entry of the profile's containers, no unpacked copy needed,
+        entries are also reachable by their TOC path and by output_folder/path for resolve
+        """
+        items = []
+        paths: Dict[str, Optional[bytes]] = {}
+        for container in profile.containers:
+            if not os.path.exists(game_path(game_folder, container.name)):
+                continue
+            index = vanilla_pak_index(profile, container, game_folder)
+            for entry in index:
+                name = PakArchive.normalize(entry.name)
+                tail = pack_taildata(container.cid, entry.meta_offset, entry.file_offset, entry.file_size)
+                items.append((name.rsplit("/", 1)[-1], f"{container.name}:{entry.name}", tail, None))
+                paths[name] = None if name in paths else tail
+                paths[f"{container.output_folder.lower()}/{name}"] = tail
+
+        result = cls.build(items)
+        result.paths = paths
+        return result
+
+    def resolve(self, rel_path: str) -> Tuple[Optional[bytes], str]:
+        """
+        Resolves a target path relative to the batch folder, the longest trailing part that names a TOC entry wins,
+        anything else falls back to the basename lookup
+        """
+        parts = PakArchive.normalize(rel_path).split("/")
+        if self.paths:
+            for start in range(len(parts) - 1):
+                tail = self.paths.get("/".join(parts[start:]))
+                if tail is not None:
+                    return tail, "OK"
+        return self.lookup(parts[-1])
+
+    def lookup(self, key: str) -> Tuple[Optional[bytes], str]:
+        """
+        Returns (taildata, "OK") or (None, reason) for a lowercased basename
+        """
+        if key in self.duplicates:
+            return None, "skipped because multiple source files share this name"
+        if key in self.invalid:
+            return None, self.invalid[key]
+        tail = self.tails.get(key)
+        if tail is None:
+            return None, "no matching original file found"
+        return tail, "OK"
+
+    @staticmethod
+    def save_cache(cache_path: str, records: Dict[str, Tuple[int, int, bytes]]) -> None:
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(TAILDATA_INDEX_HEADER.pack(TAILDATA_INDEX_MAGIC, TAILDATA_INDEX_VERSION, len(records)))
+            for path, (size, mtime_ns, tail) in records.items():
+                path_bytes = path.encode("utf-8")
+                f.write(TAILDATA_INDEX_RECORD.pack(len(path_bytes), size, mtime_ns, len(tail)))
+                f.write(path_bytes)
+                f.write(tail)
+        os.replace(tmp_path, cache_path)
+
+    @staticmethod
+    def load_cache(cache_path: str) -> Dict[str, Tuple[int, int, bytes]]:
+        """
+        Returns path -> (size, mtime_ns, taildata), empty if the cache is missing or unreadable
+        """
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+            magic, version, count = TAILDATA_INDEX_HEADER.unpack_from(data)
+            if magic != TAILDATA_INDEX_MAGIC or version != TAILDATA_INDEX_VERSION:
+                return {}
+            records = {}
+            pos = TAILDATA_INDEX_HEADER.size
+            for _ in range(count):
+                path_len, size, mtime_ns, tail_len = TAILDATA_INDEX_RECORD.unpack_from(data, pos)
+                pos += TAILDATA_INDEX_RECORD.size
+                path = data[pos:pos + path_len].decode("utf-8")
+                pos += path_len
+                records[path] = (size, mtime_ns, data[pos:pos + tail_len])
+                pos += tail_len
+            return records
+        except (OSError, struct.error, UnicodeDecodeError):
+            return {}
+
+
+class ModConflictIndex:
+    """
+    Which (container_id, meta_offset) entries every mod in the Mods folder touches, read from package headers
+    and tails only and cached per mod by size and mtime so later lookups are plain set intersections
+    """
+
+    def __init__(self, logic: "ModManagerLogic", mods_folder: Optional[str] = None, cache_path: Optional[str] = None):
+        self.logic = logic
+        self.mods_folder = mods_folder or project_path("Mods")
+        self.cache_path = cache_path or project_path(BACKUP_FOLDER, "mod_entries.idx")
+        self.entries: Dict[str, frozenset] = {}
+        self.owners: Dict[Tuple[int, int], set] = {}
+
+    def load_cache(self) -> Dict[str, Tuple[int, int, frozenset]]:
+        cached = {}
+        try:
+            cache_mtime = os.stat(self.cache_path).st_mtime_ns
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    name, size, mtime, *keys = line.rstrip("\n").split("\t")
+                    if int(mtime) >= cache_mtime:
+                        # written in the same tick as the cache, it may have changed since
+                        continue
+                    cached[name] = (int(size), int(mtime), frozenset(tuple(int(v) for v in key.split(":")) for key in keys))
+        except (OSError, ValueError):
+            return {}
+        return cached
+
+    def save_cache(self, stamps: Dict[str, Tuple[int, int]]) -> None:
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for name in sorted(self.entries):
+                size, mtime = stamps[name]
+                keys = [f"{cid}:{meta}" for cid, meta in sorted(self.entries[name])]
+                f.write("\t".join([name, str(size), str(mtime)] + keys) + "\n")
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self) -> "ModConflictIndex":
+        """
+        Rescans the Mods folder, only packages whose size or mtime changed are opened
+        """
+        cached = self.load_cache()
+        stamps: Dict[str, Tuple[int, int]] = {}
+        entries: Dict[str, frozenset] = {}
+        changed = False
+        names = sorted(f for f in os.listdir(self.mods_folder) if f.endswith(".attmod")) if os.path.isdir(self.mods_folder) else []
+        for name in names:
+            st = os.stat(os.path.join(self.mods_folder, name))
+            stamps[name] = (st.st_size, st.st_mtime_ns)
+            hit = cached.get(name)
+            if hit and hit[:2] == stamps[name]:
+                entries[name] = hit[2]
+                continue
+            changed = True
+            try:
+                entries[name] = frozenset(e.key for e in self.logic.list_mod_entries(os.path.join(self.mods_folder, name)))
+            except Exception as e:
+                print(f"Skipping {name} in the conflict index: {e}")
+                stamps.pop(name)
+
+        self.entries = entries
+        self.owners = {}
+        for name, keys in entries.items():
+            for key in keys:
+                self.owners.setdefault(key, set()).add(name)
+        if changed or set(cached) != set(entries):
+            try:
+                self.save_cache(stamps)
+            except OSError:
+                pass
+        return self
+
+    def conflicts(self, mod_name: str, among: Optional[Iterable[str]] = None) -> Dict[str, frozenset]:
+        """
+        Other mods sharing entries with mod_name, mapped to the shared (container_id, meta_offset) keys,
+        among limits the check to those mods (the applied ones for instance)
+        """
+        keys = self.entries.get(mod_name, frozenset())
+        candidates = set(among) if among is not None else set(self.entries)
+        candidates.discard(mod_name)
+        found: Dict[str, set] = {}
+        for key in keys:
+            for other in self.owners.get(key, ()):
+                if other in candidates:
+                    found.setdefault(other, set()).add(key)
+        return {other: frozenset(shared) for other, shared in found.items()}
+
+    def all_conflicts(self) -> List[Tuple[str, str, frozenset]]:
+        """
+        Every pair of mods that overlaps, with the entries they share
+        """
+        pairs: Dict[Tuple[str, str], set] = {}
+        for key, mods in self.owners.items():
+            if len(mods) < 2:
+                continue
+            ordered = sorted(mods)
+            for i, a in enumerate(ordered):
+                for b in ordered[i + 1:]:
+                    pairs.setdefault((a, b), set()).add(key)
+        return [(a, b, frozenset(keys)) for (a, b), keys in sorted(pairs.items())]
+
+
+class ModPacker:
+    def validate_taildata(self, file_path: str) -> bool:
+        with open(file_path, "rb") as f:
+            tail, _size = read_file_tail(f)
+        try:
+            unpack_taildata(tail)
+            return True
+        except Exception:
+            return False
+
+    def read_taildata_bytes(self, source_path: str) -> bytes:
+        return read_source_taildata(source_path)
+
+    def strip_existing_taildata(self, target_path: str) -> bool:
+        """
+        Removes existing Ingelmia taildata from a target file if it already has it,
+        This makes batch updates safe to run again without stacking taildata twice,
+        only IGT2 tails are stripped since any 11 bytes would pass as legacy taildata
+        """
+        with open(target_path, "rb") as f:
+            tail, size = read_file_tail(f)
+        if not has_taildata_v2(tail):
+            return False
+        os.truncate(target_path, size - TAILDATA_V2_SIZE)
+        return True
+
+    def append_taildata(self, target_path: str, taildata: bytes, replace_existing: bool = False):
+        try:
+            if replace_existing:
+                self.strip_existing_taildata(target_path)
+            with open(target_path, "ab") as t:
+                t.write(taildata)
+            return True, "OK"
+        except Exception as e:
+            return False, str(e)
+
+    def transfer_taildata(self, target_path: str, source_path: str, replace_existing: bool = False):
+        try:
+            taildata = self.read_taildata_bytes(source_path)
+        except Exception as e:
+            return False, str(e)
+        return self.append_taildata(target_path, taildata, replace_existing)
+
+    def collect_files_by_basename(self, folder: str) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        matches: Dict[str, str] = {}
+        duplicates: Dict[str, List[str]] = {}
+
+        for root, _dirs, files in os.walk(folder):
+            for filename in files:
+                full_path = os.path.join(root, filename)
+                key = filename.lower()
+                if key in matches:
+                    duplicates.setdefault(key, [matches[key]]).append(full_path)
+                else:
+                    matches[key] = full_path
+
+        for key in duplicates:
+            matches.pop(key, None)
+
+        return matches, duplicates
+
+    def batch_transfer_taildata_by_filename(self, target_folder: str, source_folder: str, workers: int = DEFAULT_PACK_WORKERS,
+                                            dry_run: bool = False, progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                                            cache_path: Optional[str] = None):
+        """
+        Transfers taildata from source_folder files into target_folder files by matching basename
+        Returns success_count, skipped_count, errors
+        """
+        if not os.path.isdir(target_folder):
+            return 0, 0, [f"Target folder missing: {target_folder}"]
+        if not os.path.isdir(source_folder):
+            return 0, 0, [f"Source folder missing: {source_folder}"]
+
+        index = TaildataIndex.from_folder(source_folder, workers, cache_path, progress_callback)
+        return self.batch_transfer_taildata(target_folder, index, workers, dry_run=dry_run, progress_callback=progress_callback)
+
+    def batch_transfer_taildata(self, target_folder: str, index: TaildataIndex, workers: int = DEFAULT_PACK_WORKERS, replace_existing: bool = False,
+                                dry_run: bool = False, progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """
+        Appends taildata from a prebuilt index to every file under target_folder on a thread pool,
+        a dry run only resolves the names so the counts say what a real run would do
+        Returns success_count, skipped_count, errors
+        """
+        if not os.path.isdir(target_folder):
+            return 0, 0, [f"Target folder missing: {target_folder}"]
+
+        jobs = []
+        skipped_count = 0
+        errors: List[str] = []
+        for root, _dirs, files in os.walk(target_folder):
+            for filename in files:
+                taildata, msg = index.resolve(os.path.relpath(os.path.join(root, filename), target_folder))
+                if taildata is None:
+                    skipped_count += 1
+                    errors.append(f"{filename}: {msg}")
+                else:
+                    jobs.append((os.path.join(root, filename), taildata))
+
+        if dry_run:
+            return len(jobs), skipped_count, errors
+
+        success_count = 0
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            results = pool.map(lambda job: self.append_taildata(job[0], job[1], replace_existing), jobs)
+            for done, ((target_path, _taildata), (success, msg)) in enumerate(zip(jobs, results), 1):
+                filename = os.path.basename(target_path)
+                if success:
+                    success_count += 1
+                else:
+                    skipped_count += 1
+                    errors.append(f"{filename}: {msg}")
+                if progress_callback:
+                    progress_callback(done, len(jobs), filename)
+
+        return success_count, skipped_count, errors
+
+    def taildata_from_toc(self, target_path: str, profile: GameProfile, game_folder: Optional[str] = None, name: Optional[str] = None,
+                          index: Optional[TaildataIndex] = None):
+        """
+        Gives one file the IGT2 taildata of the TOC entry it replaces, name defaults to the file's basename
+        and can be a path inside the container when the basename is shared, existing IGT2 taildata is replaced
+        """
+        try:
+            index = index or TaildataIndex.from_toc(profile, game_folder)
+        except Exception as e:
+            return False, str(e)
+        taildata, msg = index.resolve(name or os.path.basename(target_path))
+        if taildata is None:
+            return False, msg
+        return self.append_taildata(target_path, taildata, replace_existing=True)
+
+    def batch_taildata_from_toc(self, target_folder: str, profile: GameProfile, game_folder: Optional[str] = None, workers: int = DEFAULT_PACK_WORKERS,
+                                dry_run: bool = False, progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """
+        Batch update against the game's containers instead of an unpacked folder, existing IGT2 taildata is replaced
+        Returns success_count, skipped_count, errors
+        """
+        index = TaildataIndex.from_toc(profile, game_folder)
+        return self.batch_transfer_taildata(target_folder, index, workers, replace_existing=True, dry_run=dry_run, progress_callback=progress_callback)
+
+    def write_payload(self, f, source, payload_size: int, codec: int) -> Tuple[int, int]:
+        """
+        Streams payload_size bytes from source into f, returns (stored_size, crc32 of the raw payload)
+        """
+        compressor = mod_compressor(codec) if codec != MOD_CODEC_STORED else None
+        crc = 0
+        stored_size = 0
+        remaining = payload_size
+        while remaining:
+            chunk = source.read(min(MOD_IO_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            crc = zlib.crc32(chunk, crc)
+            out = compressor.compress(chunk) if compressor else chunk
+            f.write(out)
+            stored_size += len(out)
+        if compressor:
+            out = compressor.flush()
+            f.write(out)
+            stored_size += len(out)
+        return stored_size, crc
+
+    def write_package_entry(self, f, file_path: str, codec: int = MOD_CODEC_STORED) -> tuple:
+        """
+        Writes one size prefixed entry (payload then raw taildata) and returns its directory fields,
+        a compressed payload that doesn't come out smaller is written stored instead
+        """
+        size = os.path.getsize(file_path)
+        prefix_pos = f.tell()
+        f.write(size.to_bytes(4, "little"))
+        data_offset = f.tell()
+
+        with open(file_path, "rb") as source:
+            tail, _size = read_file_tail(source)
+            try:
+                cont_id, meta_offset, orig_off, orig_size, tail_size = unpack_taildata(tail)
+            except ValueError:
+                # kept for parity with v1 packages, the manager reports it when the mod is applied
+                cont_id, meta_offset, orig_off, orig_size, tail_size = 0xFF, 0, 0, 0, 0
+            payload_size = size - tail_size
+
+            source.seek(0)
+            stored_size, crc = self.write_payload(f, source, payload_size, codec)
+            if codec != MOD_CODEC_STORED and stored_size >= payload_size:
+                f.seek(data_offset)
+                f.truncate()
+                source.seek(0)
+                codec = MOD_CODEC_STORED
+                stored_size, crc = self.write_payload(f, source, payload_size, codec)
+            f.write(source.read())
+
+        if stored_size != payload_size:
+            end = f.tell()
+            f.seek(prefix_pos)
+            f.write((stored_size + tail_size).to_bytes(4, "little"))
+            f.seek(end)
+
+        return cont_id, meta_offset, orig_off, orig_size, data_offset, stored_size, payload_size, crc, tail_size, codec, os.path.basename(file_path)
+
+    def spool_package_entry(self, file_path: str, codec: int) -> Tuple[tuple, "tempfile.SpooledTemporaryFile"]:
+        """
+        Compresses one entry into a spooled temp file so pack workers can run ahead of the writer,
+        data_offset in the returned fields is relative to the spool
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=MOD_SPOOL_SIZE)
+        try:
+            return self.write_package_entry(spool, file_path, codec), spool
+        except Exception:
+            spool.close()
+            raise
+
+    def iter_package_entries(self, f, files: List[str], codec: int, workers: int) -> Iterator[tuple]:
+        """
+        Yields directory fields in input order, stored entries stream straight into f,
+        compressed ones are built by a pool with at most workers * MOD_QUEUE_DEPTH in flight
+        """
+        for file_path in files:
+            if not self.validate_taildata(file_path):
+                print(f"Warning: {os.path.basename(file_path)} does not contain valid Ingelmia taildata.")
+
+        if codec == MOD_CODEC_STORED or workers <= 1:
+            for file_path in files:
+                yield self.write_package_entry(f, file_path, codec)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            queued = iter(files)
+            try:
+                for file_path in queued:
+                    pending.append(pool.submit(self.spool_package_entry, file_path, codec))
+                    if len(pending) >= workers * MOD_QUEUE_DEPTH:
+                        break
+                while pending:
+                    fields, spool = pending.popleft().result()
+                    next_path = next(queued, None)
+                    if next_path is not None:
+                        pending.append(pool.submit(self.spool_package_entry, next_path, codec))
+                    with spool:
+                        base = f.tell()
+                        spool.seek(0)
+                        shutil.copyfileobj(spool, f, MOD_IO_CHUNK)
+                    # data_offset was relative to the spool, the size prefix sits in front of it
+                    yield fields[:4] + (base + fields[4],) + fields[5:]
+            finally:
+                for future in pending:
+                    if not future.cancel() and future.exception() is None:
+                        future.result()[1].close()
+
+    def create_package(self, meta, files: Iterable[str], output_path: str, image_paths: List[str] = None, compression: Optional[str] = None,
+                       progress_callback: Optional[Callable[[int, int, str], None]] = None, workers: int = DEFAULT_PACK_WORKERS):
+        """
+        compression is None (stored), "zlib", "lzma" or "zstd" (falls back to zlib without the zstandard module),
+        each entry is compressed on its own and kept stored if that doesn't make it smaller
+
+        Stored packages keep the v1 header and entry layout with the directory behind a trailer so older
+        releases still apply them, only compressed packages need the v2 header,
+        preview images are encoded in a pool and progress_callback(done, total, name) is called after every entry
+        """
+        image_paths = image_paths or []
+        codec = MOD_CODEC_STORED
+        if compression:
+            if compression not in MOD_CODECS:
+                return False, f"Unknown compression {compression}"
+            codec = MOD_CODECS[compression]
+            if codec == MOD_CODEC_ZSTD and zstandard is None:
+                print("zstandard is not installed, compressing with zlib instead.")
+                codec = MOD_CODEC_ZLIB
+        try:
+            files = list(files)
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                images = [data for data in pool.map(encode_preview_image, image_paths[:5]) if data is not None]
+
+            signature = MOD_SIGNATURE if codec == MOD_CODEC_STORED else MOD_SIGNATURE_V2
+            with open(output_path, "wb", buffering=MOD_WRITE_BUFFER) as f:
+                f.write(len(signature).to_bytes(1, "little"))
+                f.write(signature)
+                f.write(len(files).to_bytes(4, "little"))
+                directory_slot = None
+                if signature == MOD_SIGNATURE_V2:
+                    directory_slot = f.tell()
+                    f.write((0).to_bytes(8, "little"))  # directory offset, filled in once the payloads are written
+
+                author_bytes = meta.get("author", "").encode("utf-8")[:255]
+                f.write(len(author_bytes).to_bytes(1, "little"))
+                f.write(author_bytes)
 
                 ver_bytes = meta.get("version", "").encode("utf-8")[:255]
                 f.write(len(ver_bytes).to_bytes(1, "little"))
@@ -630,32 +3537,30 @@ class ModPacker:
                 f.write(len(desc_bytes).to_bytes(2, "little"))
                 f.write(desc_bytes)
 
-                valid_image_paths = image_paths[:5]
-                f.write(len(valid_image_paths).to_bytes(1, "little"))
-
-                for img_p in valid_image_paths:
-                    if not os.path.exists(img_p):
-                        continue
-                    try:
-                        with Image.open(img_p) as img:
-                            if img.mode in ("RGBA", "P"):
-                                img = img.convert("RGB")
-                            img = ImageOps.pad(img, (500, 500), color=LILAC_RGB)
-                            img_byte_arr = io.BytesIO()
-                            img.save(img_byte_arr, format="JPEG", quality=85)
-                            img_data = img_byte_arr.getvalue()
-                            f.write(len(img_data).to_bytes(4, "little"))
-                            f.write(img_data)
-                    except Exception as e:
-                        print(f"Skipping image {img_p}: {e}")
-
-                for file_path in files:
-                    if not self.validate_taildata(file_path):
-                        print(f"Warning: {os.path.basename(file_path)} does not contain valid Ingelmia taildata.")
-                    size = os.path.getsize(file_path)
-                    f.write(size.to_bytes(4, "little"))
-                    with open(file_path, "rb") as source:
-                        shutil.copyfileobj(source, f)
+                f.write(len(images).to_bytes(1, "little"))
+                for img_data in images:
+                    f.write(len(img_data).to_bytes(4, "little"))
+                    f.write(img_data)
+
+                directory = []
+                for fields in self.iter_package_entries(f, files, codec, workers):
+                    directory.append(fields)
+                    if progress_callback:
+                        progress_callback(len(directory), len(files), fields[-1])
+
+                directory_offset = f.tell()
+                f.write(MOD_DIRECTORY_MAGIC)
+                f.write(len(directory).to_bytes(4, "little"))
+                for *fields, name in directory:
+                    name_bytes = name.encode("utf-8")[:65535]
+                    f.write(MOD_DIRECTORY_ENTRY.pack(*fields, len(name_bytes)))
+                    f.write(name_bytes)
+
+                if directory_slot is None:
+                    f.write(MOD_DIRECTORY_TRAILER.pack(directory_offset, MOD_DIRECTORY_MAGIC))
+                else:
+                    f.seek(directory_slot)
+                    f.write(directory_offset.to_bytes(8, "little"))
 
             return True, f"Successfully created {os.path.basename(output_path)}"
         except Exception as e: